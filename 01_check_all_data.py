@@ -2,29 +2,46 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+from trend_pyramid import TrendPyramid, snapshot_time
 
 # 데이터 폴더 경로 (사용자 환경에 맞게 수정)
 data_dir = "./data/2nd_test"  # 또는 2nd_test (Set 2라면 2nd_test 경로)
 
-# ※ 주의: 파일이 너무 많아서 일부만 샘플링해서 그립니다.
+# ※ 예전에는 속도 때문에 10개 중 1개 파일만 읽었지만(files[::10]), 그러면 짧은 순간 피크를 놓칩니다.
+#    이제는 모든 파일의 RMS를 트렌드 피라미드(trend_pyramid/)에 한 번만 저장해두고,
+#    다음 실행부터는 새로 추가된 파일만 읽습니다. 그래프는 피라미드의 min/max/평균으로 그립니다.
+pyramid = TrendPyramid()
+bearings = ['B1', 'B2', 'B3', 'B4']
+
 files = sorted([f for f in os.listdir(data_dir) if not f.startswith('.')])
-rms_history = {'B1': [], 'B2': [], 'B3': [], 'B4': []}
+file_times = snapshot_time(files)
+
+# 4개 베어링 중 가장 늦게 갱신된 시점 이후의 파일만 읽기 (증분 갱신)
+last = min(pyramid.last_time(b, 'RMS') for b in bearings)
+new_files = [(f, t) for f, t in zip(files, file_times) if t > last]
 
-print("데이터 읽는 중...")
-# 10개씩 건너뛰며 읽기 (속도 위해)
-for file in files[::10]: 
+print(f"데이터 읽는 중... (새 파일 {len(new_files)}개 / 전체 {len(files)}개)")
+rms_history = {b: [] for b in bearings}
+for file, _ in new_files:
     df = pd.read_csv(os.path.join(data_dir, file), sep='\t', header=None)
     # Set 2 기준: col 0=B1, 1=B2, 2=B3, 3=B4
-    rms_history['B1'].append(np.sqrt(np.mean(df[0]**2)))
-    rms_history['B2'].append(np.sqrt(np.mean(df[1]**2)))
-    rms_history['B3'].append(np.sqrt(np.mean(df[2]**2)))
-    rms_history['B4'].append(np.sqrt(np.mean(df[3]**2)))
+    for col, b in enumerate(bearings):
+        rms_history[b].append(np.sqrt(np.mean(df[col]**2)))
+
+if new_files:
+    new_times = [t for _, t in new_files]
+    for b in bearings:
+        pyramid.append(b, new_times, {'RMS': rms_history[b]})
 
 plt.figure(figsize=(12, 6))
-plt.plot(rms_history['B1'], label='Bearing 1 (Failure)', color='red')
-plt.plot(rms_history['B2'], label='Bearing 2', color='blue', alpha=0.3)
-plt.plot(rms_history['B3'], label='Bearing 3', color='green', alpha=0.3)
-plt.plot(rms_history['B4'], label='Bearing 4', color='orange', alpha=0.3)
+styles = {'B1': ('Bearing 1 (Failure)', 'red', 1.0), 'B2': ('Bearing 2', 'blue', 0.3),
+          'B3': ('Bearing 3', 'green', 0.3), 'B4': ('Bearing 4', 'orange', 0.3)}
+for b, (label, color, alpha) in styles.items():
+    # 화면 폭에 맞는 해상도(약 2000점)로 읽기: 평균선 + min~max 범위(피크 보존)
+    trend = pyramid.read(b, 'RMS', max_points=2000)
+    t = pd.to_datetime(trend['t0'], unit='s')
+    plt.plot(t, trend['mean'], label=label, color=color, alpha=alpha)
+    plt.fill_between(t, trend['min'], trend['max'], color=color, alpha=alpha * 0.3, linewidth=0)
 plt.title("RMS Trend of All 4 Bearings")
 plt.legend()
-plt.show()
\ No newline at end of file
+plt.show()
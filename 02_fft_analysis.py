@@ -72,4 +72,16 @@ plt.ylabel('Amplitude')
 plt.grid(True)
 
 plt.tight_layout() # 그래프끼리 겹치지 않게 간격 자동 조절
-plt.show()
\ No newline at end of file
+plt.show()
+
+# -------------------------------------------------------------------------
+# 6. (선택) 전체 수명 이력 워터폴
+# -------------------------------------------------------------------------
+# 스냅샷 하나가 아니라 ~984개 전체의 스펙트럼을 시간 순으로 쌓아 보면, 결함 주파수가 언제부터 솟는지 보입니다.
+# 매번 FFT를 다시 하면 너무 느리므로, spectrum_cache.py로 미리 계산해 둔 캐시(waterfall/)를 잘라서 읽기만 합니다.
+# (캐시 만들기/갱신: python spectrum_cache.py ./data/2nd_test)
+from spectrum_cache import Waterfall, plot_waterfall
+
+waterfall = Waterfall()
+if 'B1' in waterfall.bearings():
+    plot_waterfall(waterfall, 'B1', f_end=5000)  # 0 ~ 5kHz 구간만
\ No newline at end of file
@@ -2,10 +2,11 @@
 import pandas as pd
 import numpy as np
 import os
-# scipy.stats: 통계적 특성을 구하기 위한 라이브러리입니다.
-# kurtosis(첨도): 데이터 분포가 얼마나 뾰족한지(충격 신호 감지) 확인
-# skew(왜도): 데이터 분포가 얼마나 비대칭인지 확인
-from scipy.stats import kurtosis, skew
+# signal_features: 파형 → 특징량 계산 모듈 (RMS, 표준편차, 최대 진폭, 첨도, 왜도)
+# 다른 단계에서도 똑같은 계산을 쓰도록 별도 모듈로 분리했습니다.
+from signal_features import snapshot_features, window_features, WINDOW_SIZE, HOP_SIZE
+# 트렌드 피라미드: 긴 이력도 빠르게 그릴 수 있도록 다중 해상도 요약을 함께 갱신합니다.
+from trend_pyramid import update_from_features
 
 # 2. 경로 및 저장 파일 설정
 # 원본 데이터가 들어있는 폴더 경로입니다.
@@ -13,10 +14,18 @@ data_dir = './data/2nd_test/'
 # 추출된 특징(Feature)들을 저장할 최종 CSV 파일명입니다.
 output_file = 'bearing_dataset_features.csv'
 
+# 스냅샷 내부 슬라이딩 창(window) 특징 설정
+# 스냅샷(20480샘플) 전체를 숫자 5개로 요약하면 짧은 충격이 평균에 묻힙니다.
+# 그래서 스냅샷 안을 겹치는 창으로 나눠 창마다 같은 특징을 구해 별도 테이블에 저장합니다. (창 번호 포함)
+ENABLE_WINDOW_FEATURES = True
+window_output_file = 'bearing_window_features.csv'
+
 # 3. 데이터 저장소 준비
 # for문을 돌면서 뽑아낸 데이터를 차곡차곡 쌓을 빈 리스트입니다.
 # 매번 DataFrame에 append 하는 것보다 리스트에 모았다가 한 번에 변환하는 게 속도가 훨씬 빠릅니다.
 data_list = []
+# 창 단위 특징은 파일마다 작은 DataFrame으로 만들어 두었다가 마지막에 한 번에 합칩니다.
+window_tables = []
 
 print("🚀 데이터 전처리를 시작합니다... (모든 파일 읽는 중)")
 
@@ -48,39 +57,28 @@ for idx, filename in enumerate(filenames):
         signal = df[0].values
         
         # --- [핵심] 기계공학적 Feature 추출 (Time Domain) ---
-        # 이 부분이 2만 개의 데이터를 단 5개의 숫자로 압축하는 과정입니다.
-        
-        # (1) RMS (Root Mean Square, 실효값)
-        # 진동의 '에너지 크기'를 나타냅니다. 베어링이 심각하게 망가지면 전체적으로 진동이 커지므로 RMS가 상승합니다.
-        rms = np.sqrt(np.mean(signal**2))
-        
-        # (2) Standard Deviation (표준편차)
-        # 진동이 평균값에서 얼마나 퍼져있는지를 나타냅니다.
-        std = np.std(signal)
-        
-        # (3) Maximum Amplitude (최대값)
-        # 순간적으로 튀는 가장 큰 충격(Peak)의 크기입니다. 
-        # 절댓값(abs)을 취해 +, - 방향 상관없이 가장 큰 진동폭을 잡습니다.
-        max_val = np.max(np.abs(signal))
-        
-        # (4) Kurtosis (첨도) - ★베어링 예지보전의 핵심★
-        # 정규분포(3.0)보다 크면 뾰족한 신호(Impulse)가 많다는 뜻입니다.
-        # 베어링 초기 결함 시 '탁, 탁' 치는 충격음이 발생하는데, 이때 RMS는 변화가 없어도 첨도는 급격히 올라갑니다.
-        kur = kurtosis(signal)
-        
-        # (5) Skewness (왜도)
-        # 파형이 한쪽으로 찌그러진 정도를 봅니다. 회전체 불균형 등이 있을 때 유의미할 수 있습니다.
-        skw = skew(signal)
-        
+        # 이 부분이 2만 개의 데이터를 단 5개의 숫자로 압축하는 과정입니다. (signal_features.py)
+        # (1) RMS: 진동의 '에너지 크기'. 베어링이 심각하게 망가지면 전체적으로 진동이 커지므로 RMS가 상승합니다.
+        # (2) Std_Dev: 진동이 평균값에서 얼마나 퍼져있는지
+        # (3) Max_Amp: 순간적으로 튀는 가장 큰 충격(Peak)의 크기 (절댓값 기준)
+        # (4) Kurtosis(첨도) - ★베어링 예지보전의 핵심★
+        #     베어링 초기 결함 시 '탁, 탁' 치는 충격음이 발생하는데, 이때 RMS는 변화가 없어도 첨도는 급격히 올라갑니다.
+        # (5) Skewness(왜도): 파형이 한쪽으로 찌그러진 정도. 회전체 불균형 등이 있을 때 유의미할 수 있습니다.
+        feats = snapshot_features(signal)
+
+        # 스냅샷 내부 창별 특징 (strided view + 누적합 → 창마다 복사/루프 없음)
+        if ENABLE_WINDOW_FEATURES:
+            win = window_features(signal, WINDOW_SIZE, HOP_SIZE)
+            win_df = pd.DataFrame(win)
+            win_df.insert(0, 'window', np.arange(len(win_df)))
+            win_df.insert(0, 'filename', filename)
+            window_tables.append(win_df)
+
         # 8. 결과 모으기
         # 파일 이름(시간 정보)과 위에서 구한 5가지 특징을 딕셔너리로 묶어서 리스트에 추가합니다.
         data_list.append({
             'filename': filename, # 나중에 이 시간 정보를 이용해 시계열 그래프를 그립니다.
-            'RMS': rms,
-            'Std_Dev': std,
-            'Max_Amp': max_val,
-            'Kurtosis': kur,
-            'Skewness': skw
+            **feats
         })
 
         # 9. 진행 상황 모니터링
@@ -100,6 +98,14 @@ final_df = pd.DataFrame(data_list)
 # index=False: 불필요한 인덱스 번호(0, 1, 2...)는 파일에 저장하지 않습니다.
 final_df.to_csv(output_file, index=False)
 
+# 창 단위 특징 테이블 저장 (행: 파일 x 창 번호)
+if ENABLE_WINDOW_FEATURES and window_tables:
+    pd.concat(window_tables, ignore_index=True).to_csv(window_output_file, index=False)
+    print(f"창 단위 특징 저장됨: {window_output_file} (창 {WINDOW_SIZE}샘플, 간격 {HOP_SIZE}샘플)")
+
+# 트렌드 피라미드 갱신 (이미 저장된 시점 이후의 스냅샷만 추가됨)
+update_from_features(final_df)
+
 # 12. 완료 메시지 및 확인
 print("-" * 30)
 print(f"🎉 모든 작업 완료!")
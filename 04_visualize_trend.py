@@ -1,11 +1,25 @@
 # 1. 라이브러리 임포트
 import pandas as pd
 import matplotlib.pyplot as plt
+from trend_pyramid import TrendPyramid, update_from_features
 
 # 2. 데이터셋 로드
-# 앞서 전처리 단계에서 만든 'bearing_dataset_features.csv' 파일을 불러옵니다.
-# 이 파일에는 시간 순서대로 정렬된 베어링의 RMS, 첨도, 왜도 등의 통계값이 들어있습니다.
-df = pd.read_csv('bearing_dataset_features.csv')
+# 앞서 전처리 단계(03_create_dataset.py)에서 함께 만들어 둔 트렌드 피라미드를 읽습니다.
+# 피라미드에는 시간 순서대로 RMS, 첨도, 왜도 등의 통계값이 여러 해상도(min/max/평균)로 요약되어 있습니다.
+# CSV의 모든 행을 그리는 대신, 화면 폭(약 2000점)에 맞는 해상도만 읽으므로 몇 년치 이력도 즉시 그려집니다.
+pyramid = TrendPyramid()
+bearing = 'B1'
+if pyramid.last_time(bearing, 'RMS') < 0:
+    # 피라미드가 아직 없으면 'bearing_dataset_features.csv'로부터 한 번 만들어 둡니다.
+    update_from_features(pd.read_csv('bearing_dataset_features.csv'))
+
+# 표시할 구간 (None = 전체 이력). 예: t_start=pd.Timestamp('2004-02-15').timestamp()
+trend = pyramid.read(bearing, 'RMS', t_start=None, t_end=None, max_points=2000)
+times = pd.to_datetime(trend['t0'], unit='s')
+
+# 파일 순서(인덱스) → 시각 변환 (가이드라인/주석 위치 지정용)
+def at_index(i):
+    return pd.to_datetime(pyramid.time_at(bearing, 'RMS', i), unit='s')
 
 # 3. 시각화 설정 (도화지 준비)
 # 가로 12인치, 세로 6인치의 넉넉한 크기로 그래프 창을 엽니다.
@@ -13,10 +27,11 @@ plt.figure(figsize=(12, 6))
 
 # 4. RMS (에너지 크기) 그래프 그리기 [메인 데이터]
 # plt.plot(x축, y축, ...)
-# x축: df.index (파일 순서, 즉 시간의 흐름을 나타냄. 0부터 980여 개까지)
-# y축: df['RMS'] (베어링의 진동 에너지 수치)
+# x축: 측정 시각 (시간의 흐름)
+# y축: 구간별 RMS 평균 (베어링의 진동 에너지 수치) + 음영: 구간 내 min~max (순간 피크 보존)
 # 베어링 마모가 진행될수록 유격이 커져서 진동 에너지(RMS)가 급격히 상승하는 원리입니다.
-plt.plot(df.index, df['RMS'], color='black', label='RMS (Vibration Energy)')
+plt.plot(times, trend['mean'], color='black', label='RMS (Vibration Energy)')
+plt.fill_between(times, trend['min'], trend['max'], color='gray', alpha=0.3, linewidth=0, label='RMS min~max')
 
 # 5. 구간 표시 (가이드라인 그리기)
 # 이 부분은 분석가가 데이터를 보고 "아, 이쯤부터 이상하네?"라고 판단한 지점을 표시하는 것입니다.
@@ -24,18 +39,18 @@ plt.plot(df.index, df['RMS'], color='black', label='RMS (Vibration Energy)')
 
 # axvline: 수직선(Vertical Line)을 그립니다.
 # x=530: 정상 상태가 끝나는 지점 (예시)
-plt.axvline(x=530, color='green', linestyle='--', alpha=0.5, label='Healthy End')
+plt.axvline(x=at_index(530), color='green', linestyle='--', alpha=0.5, label='Healthy End')
 
 # x=700: 위험 수위가 시작되는 지점 (예시)
 # 이때부터는 진동이 눈에 띄게 커지는 구간입니다.
-plt.axvline(x=700, color='orange', linestyle='--', alpha=0.5, label='Warning Start')
+plt.axvline(x=at_index(700), color='orange', linestyle='--', alpha=0.5, label='Warning Start')
 
 # 6. 그래프 꾸미기 (가독성 향상)
 # 제목: 베어링 열화(Degradation) 트렌드
 plt.title('Bearing Degradation Trend (RMS)', fontsize=16)
 
-# X축 이름: 시간 (여기서는 파일의 인덱스 순서가 곧 시간입니다)
-plt.xlabel('Time (File Index)', fontsize=12)
+# X축 이름: 측정 시각
+plt.xlabel('Time', fontsize=12)
 
 # Y축 이름: 진동 레벨 (RMS 값)
 plt.ylabel('Vibration Level (RMS)', fontsize=12)
@@ -50,12 +65,12 @@ plt.grid(True, alpha=0.3)
 # 그래프 위에 글씨를 써서 보고서용으로 만들기 좋게 합니다.
 # plt.text(x좌표, y좌표, '내용', ...)
 
-# (200, 0.05) 위치에 '정상 상태'라고 표시
-plt.text(200, 0.05, 'Normal State (Healthy)', color='green', fontsize=12, fontweight='bold')
+# (200번째 파일 시각, 0.05) 위치에 '정상 상태'라고 표시
+plt.text(at_index(200), 0.05, 'Normal State (Healthy)', color='green', fontsize=12, fontweight='bold')
 
-# (800, 0.15) 위치에 '고장 상태'라고 표시
+# (800번째 파일 시각, 0.15) 위치에 '고장 상태'라고 표시
 # 그래프 후반부에 RMS가 치솟는 구간을 강조합니다.
-plt.text(800, 0.15, 'Failure State (Broken)', color='red', fontsize=12, fontweight='bold')
+plt.text(at_index(800), 0.15, 'Failure State (Broken)', color='red', fontsize=12, fontweight='bold')
 
 # 8. 그래프 출력
 plt.show()
\ No newline at end of file
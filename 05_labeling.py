@@ -6,40 +6,38 @@ import pandas as pd # 데이터 조작을 위한 필수 도구
 # RMS, Kurtosis 같은 데이터가 들어있지만, 아직 '정답(Label)'은 없는 상태입니다.
 df = pd.read_csv('bearing_dataset_features.csv')
 
-# 3. 라벨링(Labeling) 함수 정의
-# 방금 전 단계에서 그래프(RMS Trend)를 눈으로 보고 결정한 '임계값(Threshold)'을 코드로 옮깁니다.
-# 이 함수는 데이터의 순서(index)를 입력받아 그 시점의 베어링 상태를 숫자로 반환합니다.
-def attach_label(index):
-    # 인덱스 0 ~ 530: 그래프가 바닥에 평평하게 붙어있던 구간
-    if index <= 530:
-        return 0  # 0 = Normal (정상 상태): 아무 문제 없이 잘 돌아감
-    
-    # 인덱스 531 ~ 700: 그래프가 조금씩 꿈틀거리며 상승하던 구간
-    elif index <= 700:
-        return 1  # 1 = Warning (주의/경보 단계): 미세 균열 시작, 정밀 점검 필요
-    
-    # 인덱스 701 ~ 끝: 그래프가 급격히 치솟는 구간
-    else:
-        return 2  # 2 = Failure (위험/고장 단계): 당장 기계를 멈춰야 함 (진동 폭발)
-
-# 4. 데이터프레임에 라벨 적용 (분류 모델용 정답지)
-# map() 함수를 써서 데이터프레임의 모든 행(index)에 위에서 만든 attach_label 함수를 한 번에 적용합니다.
-# 결과: 'Label'이라는 새로운 컬럼이 생기고 0, 1, 2가 채워집니다.
-# 용도: Random Forest나 CNN 같은 분류 모델이 "지금 상태가 어떤가?"를 맞추는 데 사용합니다.
-df['Label'] = df.index.map(attach_label)
-
-# 5. RUL (Remaining Useful Life, 잔존 수명) 계산 (회귀 모델용 정답지)
-# 예지보전(Predictive Maintenance)의 꽃입니다. "앞으로 며칠 더 쓸 수 있나요?"에 대한 대답입니다.
-
-# total_life: 베어링이 완전히 고장 난 마지막 시점(인덱스)을 구합니다.
-# df.index[-1]은 데이터프레임의 가장 마지막 행 번호(약 982)입니다.
-total_life = df.index[-1] 
-
-# RUL 공식: 전체 수명 - 현재 시간 = 남은 시간
-# 예: 전체 수명이 980인데, 지금 100번째 시간이라면? RUL = 980 - 100 = 880 (880만큼 더 살 수 있음)
-# 고장 시점(끝)에 가까워질수록 RUL은 0에 수렴합니다.
-# 용도: XGBoost, LSTM 같은 회귀 모델이 "고장까지 남은 시간"을 예측하는 데 사용합니다.
-df['RUL'] = total_life - df.index
+# 3. 자동 라벨링 (변화점 탐지)
+# 예전에는 RMS Trend 그래프를 눈으로 보고 고른 인덱스(530, 700)로 라벨을 붙였습니다.
+# 베어링마다 열화 곡선이 다르므로, 이제는 auto_labeling.py가 베어링별로 변화점을 찾아 라벨을 붙입니다.
+# - 0 = Normal  : 수명 초반 기준선과 통계적으로 차이가 없는 구간
+# - 1 = Warning : RMS/첨도가 기준선 대비 3σ 수준으로 지속 상승한 시점부터 (미세 균열 시작, 정밀 점검 필요)
+# - 2 = Failure : RMS가 기준선의 2배 이상으로 지속된 시점부터 (당장 기계를 멈춰야 함)
+# 'bearing' 컬럼이 없으면(베어링 1개 데이터) 전체를 베어링 하나로 봅니다.
+from auto_labeling import label_fleet
+
+# 수명 끝(고장)까지 운전된 것이 확인된 베어링 (NASA 2nd_test는 B1이 외륜 결함으로 고장)
+RUN_TO_FAILURE = ['B1']
+
+had_bearing = 'bearing' in df.columns
+df, summary = label_fleet(df, run_to_failure=RUN_TO_FAILURE)
+
+# 4. RUL (Remaining Useful Life, 잔존 수명)
+# label_fleet이 베어링마다 "그 베어링의 마지막 시점 - 현재 시점"으로 함께 계산합니다.
+# 고장 시점(끝)에 가까워질수록 RUL은 0에 수렴합니다. (용도: XGBoost 같은 회귀 모델의 정답지)
+# ※ 단, 마지막 스냅샷이 고장 시점이라는 근거가 있는 베어링에만 붙입니다.
+#    (위험 단계가 탐지되었거나 RUN_TO_FAILURE에 있는 베어링)
+#    아직 운전 중인 베어링은 "남은 수명"을 알 수 없으므로 RUL이 비어 있고(NaN), 07/08 RUL 학습에서 제외됩니다.
+#    (Label은 그대로 붙으므로 06 상태 분류 학습에는 사용됩니다)
+
+# 5. 변화점 / 처리 시간 확인
+print("🔎 베어링별 변화점 (스냅샷 순번)")
+print(summary[['bearing', 'n', 'warning_start', 'failure_start']].to_string(index=False))
+print(f"RUL 라벨 없음(운전 중): {int(df['RUL'].isna().sum())}행")
+print(f"⏱️ 라벨링 시간: 베어링당 평균 {summary['time_ms'].mean():.2f} ms (총 {summary['time_ms'].sum():.1f} ms)")
+
+# 학습 단계(06, 07)가 기대하는 컬럼 구성을 유지하기 위해 임시로 만든 bearing 컬럼은 빼고 저장합니다.
+if not had_bearing:
+    df = df.drop(columns='bearing')
 
 # 6. 최종 학습용 데이터 저장
 # 기계공학적 특징(RMS 등) + 정답지(Label, RUL)가 모두 합쳐진 완벽한 데이터셋이 완성되었습니다.
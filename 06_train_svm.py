@@ -5,6 +5,7 @@ from sklearn.model_selection import train_test_split # 데이터를 수능 공
 from sklearn.preprocessing import StandardScaler # 데이터의 단위를 통일시켜주는 스케일러 (SVM에선 필수!)
 from sklearn.svm import SVC # Support Vector Classifier (분류를 담당하는 SVM 모델)
 from sklearn.metrics import accuracy_score, classification_report # 채점표(정확도, 정밀도 등)를 출력하는 도구
+from train_state import save_state # 어디까지 학습했는지 기록 (08_incremental_update.py가 이후 행만 학습)
 
 # 2. 최종 데이터셋 로드
 # 앞서 라벨링(0:정상, 1:주의, 2:위험)까지 마친 최종 CSV 파일을 불러옵니다.
@@ -72,4 +73,5 @@ print("상세 리포트:\n", classification_report(y_test, y_pred))
 # 나중에 공장 라즈베리파이 같은 엣지 디바이스에서는 이 파일만 불러와서(load) 바로 판별하면 됩니다.
 joblib.dump(model, 'svm_model.pkl')
 joblib.dump(scaler, 'scaler.pkl')
+save_state(df, 'svm')
 print("✅ 모델 저장 완료: svm_model.pkl, scaler.pkl")
\ No newline at end of file
@@ -12,14 +12,24 @@ from sklearn.model_selection import train_test_split
 # 회귀(Regression) 문제이므로 '정확도(Accuracy)' 대신 '오차(Error)'를 계산하는 함수들을 가져옵니다.
 from sklearn.metrics import mean_squared_error, r2_score
 
+# 열화 추세 특징 (이동 평균, 기울기, EWMA) - 서빙(main.py)과 같은 계산 정의를 공유합니다.
+from degradation_features import add_degradation_features, feature_names
+from signal_features import FEATURES # 순간 특징 5개 (이력 없는 요청용 기본 모델 입력)
+from train_state import save_state # 어디까지 학습했는지 기록 (08_incremental_update.py가 이후 행만 학습)
+
 # 2. 데이터 로드
 # 이전 단계에서 RUL(남은 수명) 계산까지 마친 최종 데이터셋을 불러옵니다.
 df = pd.read_csv('bearing_dataset_final.csv')
 
 # 3. 데이터 준비 (Feature Selection)
 # X (Features): 기계공학적 통계 수치들 (입력값)
-# 학습시킬 특징들을 선택합니다. 이 값들이 변하면 수명도 변한다는 가정을 합니다.
-features = ['RMS', 'Std_Dev', 'Max_Amp', 'Kurtosis', 'Skewness']
+# 순간 특징 5개만으로는 "얼마나 빨리 나빠지는 중인지"를 알 수 없으므로,
+# 베어링별 시간 순서로 추세 특징(RMS/첨도의 이동 평균·기울기·EWMA)을 추가합니다.
+# (단, 이력 없이 스냅샷 하나만 들어오는 요청도 있으므로 순간 특징 5개짜리 기본 모델도 함께 학습합니다. 5-1 참고)
+df = add_degradation_features(df)
+# 추세 특징은 전체 이력으로 계산한 뒤, RUL 정답이 없는 행(아직 운전 중인 베어링, 05 참고)은 학습에서 뺍니다.
+df = df.dropna(subset=['RUL'])
+features = feature_names()
 X = df[features]
 
 # y (Target): 예측해야 할 정답지 (RUL)
@@ -46,6 +56,12 @@ rul_model = xgb.XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=5, r
 # (참고: XGBoost는 트리 기반이라 데이터 스케일링(StandardScaler)이 필수는 아니지만, 하면 더 좋을 때도 있습니다.)
 rul_model.fit(X_train, y_train)
 
+# 5-1. 기본 모델 (순간 특징 5개)
+# bearing_id 없이 들어온 요청, 서버 재시작 직후처럼 베어링 이력(추세)이 없을 때 main.py가 이 모델을 씁니다.
+# 이력이 없는데 추세 모델에 넣으면 "수명 초반 베어링"으로 보여 RUL이 크게 부풀려지기 때문입니다.
+base_model = xgb.XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=5, random_state=42)
+base_model.fit(X_train[FEATURES], y_train)
+
 # 6. 성능 평가 (채점)
 # .predict(): 테스트 문제지(X_test)를 주고 예측값(predictions)을 받아옵니다.
 predictions = rul_model.predict(X_test)
@@ -60,9 +76,12 @@ rmse = np.sqrt(mean_squared_error(y_test, predictions))
 # 1.0에 가까울수록 완벽하게 예측했다는 뜻이고, 0에 가까우면 찍은 것과 다름없다는 뜻입니다.
 r2 = r2_score(y_test, predictions)
 
+base_rmse = np.sqrt(mean_squared_error(y_test, base_model.predict(X_test[FEATURES])))
+
 print("-" * 30)
 print(f"오차 범위(RMSE): 약 {rmse:.2f} 포인트") # 예: 약 15.3 포인트 (±15단위 정도 틀림)
 print(f"설명력(R2 Score): {r2:.2f} (1.0에 가까울수록 완벽)") # 예: 0.95 (매우 우수함)
+print(f"기본 모델(순간 특징 5개) RMSE: 약 {base_rmse:.2f} 포인트")
 print("-" * 30)
 
 # 7. 결과 시각화 (Actual vs Predicted)
@@ -86,5 +105,11 @@ plt.show()
 # 8. 모델 저장
 # 고장 예측 모델을 파일로 저장합니다. 
 # 나중에 이 파일과 이전에 만든 svm_model.pkl 두 개를 이용해 종합 진단 시스템을 구축할 수 있습니다.
-joblib.dump(rul_model, 'xgboost_rul.pkl')
-print("✅ 모델 저장 완료: xgboost_rul.pkl")
\ No newline at end of file
+# - xgboost_rul.pkl: 기본 모델 (순간 특징 5개, 기존 파일과 같은 입력이므로 예전 서버도 그대로 씁니다)
+# - xgboost_rul_trend.pkl: 추세 모델 + 입력 컬럼 순서(rul_features.pkl). main.py는 베어링 이력이 충분할 때만 씁니다.
+joblib.dump(base_model, 'xgboost_rul.pkl')
+joblib.dump(rul_model, 'xgboost_rul_trend.pkl')
+joblib.dump(features, 'rul_features.pkl')
+save_state(df, 'rul')
+save_state(df, 'rul_trend')
+print("✅ 모델 저장 완료: xgboost_rul.pkl (기본), xgboost_rul_trend.pkl (+ rul_features.pkl)")
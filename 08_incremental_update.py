@@ -0,0 +1,166 @@
+# 08_incremental_update.py
+# 증분(warm-start) 재학습: 새로 쌓인 데이터만으로 기존 모델을 이어서 학습합니다.
+# - 06/07은 전체 CSV로 처음부터 다시 학습하므로 이력이 쌓일수록 느려집니다.
+# - 여기서는 train_state.json의 워터마크 이후 행(새 데이터)만 사용합니다.
+#   · XGBoost RUL 모델: 기존 부스터에 트리를 몇 개 더 이어 붙입니다. (xgb_model=기존 부스터)
+#     기본 모델(xgboost_rul.pkl, 순간 특징 5개)과 추세 모델(xgboost_rul_trend.pkl)을 각자의 워터마크로 따로 업데이트합니다.
+#   · SVM 상태 분류기: SVC는 부분 학습이 없으므로, 기존 결정 경계를 요약하는 서포트 벡터 + 새 행만으로 다시 맞춥니다.
+#     (스케일러는 기존 것을 그대로 씁니다. 서포트 벡터가 기존 스케일 공간의 좌표이기 때문)
+# - 새 데이터 중 베어링별 가장 최근 구간(시간 순 마지막 20%)은 학습에 쓰지 않고 검증용으로 떼어 두고,
+#   업데이트된 모델이 그 구간에서 기존 모델보다 나쁘지 않을 때만 모델 파일을 교체(promote)합니다.
+#
+# 실행 예시: python 08_incremental_update.py                 (증분 업데이트)
+#           python 08_incremental_update.py --compare-full   (전체 재학습과 소요 시간/성능 비교)
+import argparse
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, mean_squared_error
+from sklearn.svm import SVC
+
+from degradation_features import add_degradation_features
+from signal_features import FEATURES as BASE_FEATURES   # 순간 특징 5개 (SVM 입력, 기본 RUL 모델 입력)
+from train_state import new_rows, save_state
+
+parser = argparse.ArgumentParser(description="새 데이터만으로 RUL/상태 모델 증분 업데이트")
+parser.add_argument("--data", default="bearing_dataset_final.csv")
+parser.add_argument("--trees", type=int, default=30, help="XGBoost에 이어 붙일 트리 개수")
+parser.add_argument("--holdout", type=float, default=0.2, help="새 데이터 중 검증용으로 뗄 최근 구간 비율")
+parser.add_argument("--min-rows", type=int, default=20, help="이보다 새 행이 적으면 업데이트하지 않음")
+parser.add_argument("--tolerance", type=float, default=0.0, help="검증 성능이 이만큼(비율) 나빠져도 교체 허용")
+parser.add_argument("--drift-limit", type=float, default=3.0, help="새 데이터 특징 평균의 |z| 경고 기준")
+parser.add_argument("--compare-full", action="store_true", help="전체 재학습도 실행해 시간/성능 비교")
+args = parser.parse_args()
+
+# ==========================================
+# 1. 데이터 / 기존 모델 로드
+# ==========================================
+df = pd.read_csv(args.data)
+# 추세 특징은 과거 행이 있어야 계산되므로 전체 이력에서 계산한 뒤 새 행만 골라 씁니다.
+df = add_degradation_features(df)
+if 'bearing' not in df.columns:
+    df['bearing'] = 'B1'
+
+scaler = joblib.load('scaler.pkl')
+svm_model = joblib.load('svm_model.pkl')
+# RUL 모델: (워터마크 이름, 파일, 입력 컬럼). 추세 모델은 07_train_rul.py가 만든 경우에만 업데이트합니다.
+rul_models = [('rul', 'xgboost_rul.pkl', BASE_FEATURES)]
+if os.path.exists('xgboost_rul_trend.pkl') and os.path.exists('rul_features.pkl'):
+    rul_models.append(('rul_trend', 'xgboost_rul_trend.pkl', joblib.load('rul_features.pkl')))
+
+
+def split_time(mask):
+    """새 행(mask) 중 베어링별 시간 순 마지막 holdout 비율을 검증용으로 분리 → (학습 인덱스, 검증 인덱스)"""
+    new = df[mask].sort_values(['bearing', 'filename'])
+    pos = new.groupby('bearing').cumcount(ascending=False)      # 뒤에서부터 센 순번
+    size = new.groupby('bearing')['filename'].transform('size')
+    hold = pos < np.floor(size * args.holdout).clip(lower=1)
+    return new.index[~hold.to_numpy()], new.index[hold.to_numpy()]
+
+
+def promote(path, model):
+    """기존 모델은 .prev.pkl로 남기고 새 모델로 교체"""
+    shutil.copyfile(path, path.replace('.pkl', '.prev.pkl'))
+    joblib.dump(model, path)
+
+
+def report(name, metric, old, new, t_inc, t_full=None, full=None):
+    print(f"[{name}] 검증 {metric}: 기존 {old:.4f} → 증분 {new:.4f}" + (f" / 전체 재학습 {full:.4f}" if full is not None else ""))
+    print(f"[{name}] 학습 시간: 증분 {t_inc:.2f}s" + (f" / 전체 재학습 {t_full:.2f}s (x{t_full / max(t_inc, 1e-9):.1f} 절약)"
+                                                     if t_full is not None else ""))
+
+
+# ==========================================
+# 2. RUL 모델 (XGBoost) 이어서 학습
+# ==========================================
+# RUL 정답이 없는 행(아직 운전 중인 베어링)은 제외 → 나중에 고장이 확인되어 RUL이 붙으면 그때 학습됩니다.
+for name, path, rul_features in rul_models:
+    rul_model = joblib.load(path)
+    rul_mask = new_rows(df, name) & df['RUL'].notna().to_numpy()
+    print(f"📥 RUL 모델({path}) 새 행: {rul_mask.sum()}개 / 전체 {len(df)}개")
+    if rul_mask.sum() < args.min_rows:
+        print(f"⏭️ 새 데이터가 부족하여 {path} 업데이트를 건너뜁니다.")
+        continue
+    train_idx, hold_idx = split_time(rul_mask)
+    X_hold, y_hold = df.loc[hold_idx, rul_features], df.loc[hold_idx, 'RUL']
+
+    t0 = time.perf_counter()
+    updated = xgb.XGBRegressor(**{**rul_model.get_params(), 'n_estimators': args.trees})
+    updated.fit(df.loc[train_idx, rul_features], df.loc[train_idx, 'RUL'], xgb_model=rul_model.get_booster())
+    t_inc = time.perf_counter() - t0
+
+    rmse_old = np.sqrt(mean_squared_error(y_hold, rul_model.predict(X_hold)))
+    rmse_new = np.sqrt(mean_squared_error(y_hold, updated.predict(X_hold)))
+
+    t_full = rmse_full = None
+    if args.compare_full:
+        # 비교용: 지금까지 학습한 행 + 이번 새 학습 행 전체로 처음부터 학습 (06/07과 같은 방식)
+        all_idx = df.index[~rul_mask & df['RUL'].notna().to_numpy()].append(train_idx)
+        t0 = time.perf_counter()
+        full = xgb.XGBRegressor(**rul_model.get_params())
+        full.fit(df.loc[all_idx, rul_features], df.loc[all_idx, 'RUL'])
+        t_full = time.perf_counter() - t0
+        rmse_full = np.sqrt(mean_squared_error(y_hold, full.predict(X_hold)))
+
+    report(name.upper(), 'RMSE', rmse_old, rmse_new, t_inc, t_full, rmse_full)
+    if rmse_new <= rmse_old * (1 + args.tolerance):
+        promote(path, updated)
+        save_state(df.loc[train_idx], name)
+        print(f"✅ RUL 모델 교체 완료 ({path}, 이전 모델: {path.replace('.pkl', '.prev.pkl')})")
+    else:
+        print(f"⏸️ 검증 구간 성능이 나빠져 {path}를 교체하지 않습니다.")
+
+# ==========================================
+# 3. 상태 분류기 (SVM) 업데이트
+# ==========================================
+svm_mask = new_rows(df, 'svm')
+print(f"📥 SVM 새 행: {svm_mask.sum()}개")
+if svm_mask.sum() >= args.min_rows:
+    train_idx, hold_idx = split_time(svm_mask)
+    X_new = scaler.transform(df.loc[train_idx, BASE_FEATURES])
+    X_hold = scaler.transform(df.loc[hold_idx, BASE_FEATURES])
+    y_hold = df.loc[hold_idx, 'Label']
+
+    # 드리프트 확인: 기존 스케일러 기준으로 새 데이터 특징 평균이 얼마나 벗어났는지 (정상 분포 = 0 근처)
+    drift = np.abs(X_new.mean(axis=0))
+    print(f"📊 특징 드리프트(|z| 평균): " + ", ".join(f"{f} {d:.2f}" for f, d in zip(BASE_FEATURES, drift)))
+    if drift.max() > args.drift_limit:
+        print(f"⚠️ 드리프트가 {args.drift_limit}σ를 넘었습니다. 스케일러가 낡았을 수 있으니 06_train_svm.py 전체 재학습을 권장합니다.")
+
+    t0 = time.perf_counter()
+    # 기존 서포트 벡터(스케일된 좌표)와 그 라벨: n_support_는 classes_ 순서대로 클래스별 개수
+    sv_labels = np.repeat(svm_model.classes_, svm_model.n_support_)
+    updated = SVC(**svm_model.get_params())
+    updated.fit(np.vstack([svm_model.support_vectors_, X_new]),
+                np.concatenate([sv_labels, df.loc[train_idx, 'Label'].to_numpy()]))
+    t_inc = time.perf_counter() - t0
+
+    acc_old = accuracy_score(y_hold, svm_model.predict(X_hold))
+    acc_new = accuracy_score(y_hold, updated.predict(X_hold))
+
+    t_full = acc_full = None
+    if args.compare_full:
+        all_idx = df.index[~svm_mask].append(train_idx)
+        t0 = time.perf_counter()
+        full = SVC(**svm_model.get_params())
+        full.fit(scaler.transform(df.loc[all_idx, BASE_FEATURES]), df.loc[all_idx, 'Label'])
+        t_full = time.perf_counter() - t0
+        acc_full = accuracy_score(y_hold, full.predict(X_hold))
+
+    report('SVM', '정확도', acc_old, acc_new, t_inc, t_full, acc_full)
+    if acc_new >= acc_old * (1 - args.tolerance):
+        promote('svm_model.pkl', updated)
+        save_state(df.loc[train_idx], 'svm')
+        print("✅ SVM 모델 교체 완료 (svm_model.pkl, 이전 모델: svm_model.prev.pkl)")
+    else:
+        print("⏸️ 검증 구간 정확도가 떨어져 SVM 모델을 교체하지 않습니다.")
+else:
+    print("⏭️ 새 데이터가 부족하여 SVM 업데이트를 건너뜁니다.")
+
+print("-" * 30)
+print("ℹ️ 실행 중인 서버(main.py / serve.py)는 재시작해야 교체된 모델을 불러옵니다.")
@@ -0,0 +1,106 @@
+# auto_labeling.py
+# 변화점(Change-point) 탐지 기반 자동 라벨링
+# - 05_labeling.py의 원래 방식은 그래프를 눈으로 보고 고른 파일 인덱스(530, 700)로 라벨을 붙였습니다.
+#   베어링이 수백 개가 되면 베어링마다 열화 곡선이 달라서 이 방식은 쓸 수 없습니다.
+# - 여기서는 베어링마다 초기 구간(정상 기준선)을 잡고 CUSUM(누적합 관리도)으로 "지속적으로 높아진 시점"을 찾습니다.
+#   · 주의(Warning) 시작: RMS·첨도의 기준선 z-score가 3σ 수준으로 지속 상승한 시점 (통계적으로 유의한 이탈)
+#   · 위험(Failure) 시작: RMS가 기준선 평균의 FAILURE_RATIO배 이상으로 지속된 시점 (물리적 진동 증가)
+#     (주의 시작 이후 구간에서만 찾습니다)
+# - CUSUM 점화식 S_t = max(0, S_{t-1} + x_t - k)는 누적합 - 누적최소값으로 풀 수 있으므로
+#   np.cumsum / np.minimum.accumulate 로 루프 없이 선형 시간에 계산됩니다.
+import time
+
+import numpy as np
+import pandas as pd
+
+BASELINE_FRAC = 0.2     # 수명 초반 몇 %를 정상 기준선으로 볼지
+BASELINE_MIN = 10       # 기준선 최소 스냅샷 수
+WARNING_SIGMA = 3.0     # 주의 단계: 기준선 대비 3σ 지속 상승
+WARNING_H = 5.0         # 주의 CUSUM 경보 임계값 (σ 단위 누적, 클수록 둔감 → 오경보 감소)
+FAILURE_RATIO = 2.0     # 위험 단계: RMS가 기준선 평균의 2배 이상으로 지속
+FAILURE_H = 2.0         # 위험 CUSUM 경보 임계값 (배수 단위 누적)
+INDICATORS = ("RMS", "Kurtosis")
+
+
+def baseline_scores(frame, indicators=INDICATORS, baseline_frac=BASELINE_FRAC):
+    """
+    베어링 하나(시간 순)의 특징량 → (지표별 기준선 z-score 중 최대값, 기준선 대비 RMS 배수)
+    기준선 = 수명 초반 baseline_frac 구간 (최소 BASELINE_MIN개)
+    """
+    n = len(frame)
+    n_base = min(n, max(BASELINE_MIN, int(n * baseline_frac)))
+    z = []
+    for col in indicators:
+        x = frame[col].to_numpy(dtype=np.float64)
+        base = x[:n_base]
+        z.append((x - base.mean()) / (base.std() or 1.0))
+    rms = frame["RMS"].to_numpy(dtype=np.float64)
+    ratio = rms / (rms[:n_base].mean() or 1.0)
+    return np.max(z, axis=0), ratio
+
+
+def cusum_change_point(x, k, h):
+    """
+    상향 CUSUM: x가 기준값 k보다 지속적으로 높아진 시점을 찾습니다.
+    반환: 변화 시작 인덱스 (경보가 없으면 len(x))
+    """
+    n = len(x)
+    if n == 0:
+        return 0
+    c = np.concatenate(([0.0], np.cumsum(x - k)))      # C_0 = 0, C_t = Σ(x - k)
+    s = c - np.minimum.accumulate(c)                    # S_t = C_t - min_{s≤t} C_s
+    alarm = np.flatnonzero(s[1:] > h)
+    if len(alarm) == 0:
+        return n
+    t_alarm = alarm[0] + 1
+    # 경보 직전 S가 마지막으로 0이었던 지점(= 누적합이 최소였던 지점) 다음이 변화 시작
+    return int(t_alarm - np.argmin(c[t_alarm::-1]))
+
+
+def detect_bearing(frame):
+    """베어링 하나(시간 순 정렬)의 (주의 시작, 위험 시작) 인덱스"""
+    z, ratio = baseline_scores(frame)
+    # 3σ 이동을 잡는 표준 CUSUM 설정: 기준값 k = 이동량의 절반
+    cp_warn = cusum_change_point(z, WARNING_SIGMA / 2, WARNING_H)
+    cp_fail = cp_warn + cusum_change_point(ratio[cp_warn:], FAILURE_RATIO, FAILURE_H)
+    return cp_warn, cp_fail
+
+
+def label_fleet(df, bearing_col="bearing", order_col="filename", default_bearing="B1", run_to_failure=()):
+    """
+    전체 특징량 테이블(여러 베어링)에 Label(0/1/2)과 RUL을 붙여 반환합니다.
+    - bearing 컬럼이 없으면 테이블 전체를 베어링 하나로 봅니다.
+    - RUL은 "마지막 스냅샷 = 수명 끝"이 확실한 베어링에만 붙입니다.
+      (위험 단계가 탐지되었거나 run_to_failure에 들어 있는 베어링)
+      아직 운전 중인 베어링은 마지막 스냅샷이 고장 시점이 아니므로 RUL = NaN (학습에서 제외)
+    - 반환: (라벨이 붙은 DataFrame, 베어링별 변화점/소요시간 요약 DataFrame)
+    """
+    df = df.copy()
+    if bearing_col not in df.columns:
+        df[bearing_col] = default_bearing
+    sort_cols = [bearing_col] + ([order_col] if order_col in df.columns else [])
+    ordered = df.sort_values(sort_cols, kind="stable")
+
+    # 1. 베어링별 변화점 탐지 (베어링 하나당 선형 시간)
+    summary = []
+    for bearing, group in ordered.groupby(bearing_col, sort=False):
+        t0 = time.perf_counter()
+        cp_warn, cp_fail = detect_bearing(group)
+        elapsed = time.perf_counter() - t0
+        summary.append({"bearing": bearing, "n": len(group), "warning_start": cp_warn,
+                        "failure_start": cp_fail, "time_ms": elapsed * 1000})
+    summary = pd.DataFrame(summary)
+
+    # 2. 라벨 / RUL 일괄 계산 (행 단위 map 없이 벡터 연산)
+    grouped = ordered.groupby(bearing_col, sort=False)
+    pos = grouped.cumcount().to_numpy()                          # 베어링 안에서의 시간 순서
+    cps = summary.set_index("bearing")
+    warn_at = ordered[bearing_col].map(cps["warning_start"]).to_numpy()
+    fail_at = ordered[bearing_col].map(cps["failure_start"]).to_numpy()
+    ordered["Label"] = (pos >= warn_at).astype(int) + (pos >= fail_at).astype(int)
+    # RUL = 그 베어링의 마지막 시점 - 현재 시점 (05_labeling.py 원래 정의와 동일)
+    ended = (cps["failure_start"] < cps["n"]) | cps.index.isin(list(run_to_failure))
+    rul = grouped.cumcount(ascending=False).astype(float)
+    ordered["RUL"] = rul.where(ordered[bearing_col].map(ended).to_numpy(dtype=bool)).to_numpy()
+
+    return ordered.loc[df.index], summary
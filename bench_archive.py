@@ -0,0 +1,82 @@
+# bench_archive.py
+# 원시 파형 아카이브(raw_archive.py) 압축률 / 디코딩 처리량 벤치마크
+# - --data-dir를 주면 실제 NASA 스냅샷 폴더를, 생략하면 비슷한 형식의 합성 스냅샷을 만들어 사용합니다.
+#
+# 실행 예시: python bench_archive.py --snapshots 200
+#           python bench_archive.py --data-dir ./data/2nd_test
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from raw_archive import ArchiveReader, convert_directory
+
+FS = 20000
+N_SAMPLES = 20480
+
+
+def make_synthetic(directory, n_snapshots, seed=0):
+    """NASA 형식(탭 구분, 소수점 3자리, 4채널) 합성 스냅샷 생성: 잡음 + 회전 성분 + 간헐 충격"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(N_SAMPLES) / FS
+    for i in range(n_snapshots):
+        severity = i / max(n_snapshots - 1, 1)
+        sig = 0.07 * rng.standard_normal((N_SAMPLES, 4)) + 0.02 * np.sin(2 * np.pi * 33.3 * t)[:, None]
+        impacts = rng.random(N_SAMPLES) < 0.0005 * (1 + 10 * severity)
+        sig[impacts, 0] += rng.normal(0, 0.5 * (1 + 5 * severity), impacts.sum())
+        stamp = time.strftime("%Y.%m.%d.%H.%M.%S", time.gmtime(1076582559 + 600 * i))
+        np.savetxt(os.path.join(directory, stamp), sig, fmt="%.3f", delimiter="\t")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="raw_archive 벤치마크")
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--snapshots", type=int, default=100, help="합성 스냅샷 개수 (--data-dir 없을 때)")
+    parser.add_argument("--random-reads", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if data_dir is None:
+            data_dir = os.path.join(tmp, "snapshots")
+            os.makedirs(data_dir)
+            print(f"합성 스냅샷 {args.snapshots}개 생성 중...")
+            make_synthetic(data_dir, args.snapshots)
+        text_bytes = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir))
+
+        archive = os.path.join(tmp, "bench.braw")
+        t0 = time.perf_counter()
+        convert_directory(data_dir, archive)
+        t_convert = time.perf_counter() - t0
+        archive_bytes = os.path.getsize(archive)
+
+        with ArchiveReader(archive) as reader:
+            n = len(reader)
+            # (1) 전체 순차 디코딩
+            t0 = time.perf_counter()
+            decoded = 0
+            for i in range(n):
+                decoded += reader.read(i).nbytes
+            t_seq = time.perf_counter() - t0
+
+            # (2) 임의 스냅샷·채널 하나씩 읽기
+            rng = np.random.default_rng(1)
+            picks = [(int(rng.integers(n)), int(rng.integers(reader.n_channels))) for _ in range(args.random_reads)]
+            t0 = time.perf_counter()
+            for s, ch in picks:
+                reader.read(s, ch)
+            t_rand = (time.perf_counter() - t0) / len(picks)
+
+    print("-" * 50)
+    print(f"스냅샷 {n}개, 텍스트 {text_bytes / 1e6:.1f} MB → 아카이브 {archive_bytes / 1e6:.1f} MB "
+          f"(압축률 {text_bytes / archive_bytes:.1f}x, float32 대비 {decoded / archive_bytes:.1f}x)")
+    print(f"변환 속도: {text_bytes / 1e6 / t_convert:.1f} MB/s (텍스트 기준)")
+    print(f"순차 디코딩: {decoded / 1e6 / t_seq:.1f} MB/s (float32 출력), {n / t_seq:.0f} 스냅샷/s")
+    print(f"랜덤 단일 채널 읽기: 평균 {t_rand * 1e3:.3f} ms")
+    print("-" * 50)
+
+
+if __name__ == "__main__":
+    main()
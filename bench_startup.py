@@ -0,0 +1,90 @@
+# bench_startup.py
+# 서비스(main.py) 기동 시간 벤치마크
+# - 매번 새 파이썬 프로세스에서 `import main` + /ready가 200(모델 로드 완료)이 될 때까지의 시간을 잽니다.
+#   (warm 파라미터 없이 폴링하므로 실제 로드밸런서 헬스체크와 같은 조건입니다)
+# - 무거운 SDK(groq, pinecone, google.generativeai)가 import 시점에 로드되지 않는지도 확인합니다.
+# - 예산(budget)을 넘으면 종료 코드 1로 끝나므로 CI에서 그대로 사용할 수 있습니다.
+#
+# 실행 예시: python bench_startup.py --repeat 5 --import-budget 1.5 --boot-budget 4.0
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 기동 후 sys.modules 에 있으면 안 되는 무거운 모듈들
+HEAVY_MODULES = ["groq", "pinecone", "google.generativeai"]
+
+# 자식 프로세스에서 실행할 측정 코드
+CHILD_CODE = """
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter() - t0
+from fastapi.testclient import TestClient
+with TestClient(main.app) as c:
+    # 기동 시 백그라운드 모델 로드가 끝날 때까지 /ready 폴링 (최대 %r초)
+    deadline = time.perf_counter() + %r
+    while True:
+        status = c.get("/ready").status_code
+        if status == 200 or time.perf_counter() > deadline:
+            break
+        time.sleep(0.01)
+t_boot = time.perf_counter() - t0
+heavy = [m for m in %r if m in sys.modules]
+print(json.dumps({"import": t_import, "boot": t_boot, "ready_status": status, "heavy": heavy}))
+"""
+
+
+def measure_once(ready_timeout):
+    # 측정 대상 디렉토리(main.py 위치)에서 새 인터프리터를 띄웁니다.
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE % (ready_timeout, ready_timeout, HEAVY_MODULES)],
+        cwd=here, capture_output=True, text=True, check=True,
+    )
+    # main.py의 print 로그가 섞일 수 있으므로 마지막 줄(JSON)만 읽습니다.
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py 기동 시간 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=1.5, help="import main 허용 시간(초)")
+    parser.add_argument("--boot-budget", type=float, default=4.0, help="/ready가 200이 될 때까지 허용 시간(초)")
+    parser.add_argument("--ready-timeout", type=float, default=30.0, help="/ready 폴링을 포기하는 시간(초)")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.ready_timeout) for _ in range(args.repeat)]
+    t_import = statistics.median(r["import"] for r in runs)
+    t_boot = statistics.median(r["boot"] for r in runs)
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+
+    print("-" * 30)
+    print(f"import main (median): {t_import * 1000:.1f} ms  (budget {args.import_budget * 1000:.0f} ms)")
+    print(f"boot → /ready 200 (median): {t_boot * 1000:.1f} ms  (budget {args.boot_budget * 1000:.0f} ms)")
+    print(f"/ready 상태 코드: {sorted({r['ready_status'] for r in runs})}")
+    print(f"import 시점에 로드된 무거운 SDK: {heavy or '없음'}")
+    print("-" * 30)
+
+    failed = False
+    if any(r["ready_status"] != 200 for r in runs):
+        print("❌ /ready가 200이 되지 않음 (모델 로드 실패 또는 시간 초과)")
+        failed = True
+    if heavy:
+        print(f"❌ 지연 import 위반: {heavy}")
+        failed = True
+    if t_import > args.import_budget:
+        print("❌ import 예산 초과")
+        failed = True
+    if t_boot > args.boot_budget:
+        print("❌ 기동 예산 초과")
+        failed = True
+    if not failed:
+        print("✅ 기동 시간 예산 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
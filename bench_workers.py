@@ -0,0 +1,112 @@
+# bench_workers.py
+# 워커 수에 따른 처리량(requests/sec)과 워커당 메모리(RSS/PSS) 벤치마크
+# - serve.py를 워커 수를 바꿔가며 띄우고, 여러 클라이언트 프로세스로 /diagnose를 일정 시간 호출합니다.
+# - PSS(Proportional Set Size)는 공유 페이지를 공유한 프로세스 수로 나눈 값이라
+#   Copy-on-Write 공유 효과가 그대로 드러납니다. (RSS는 공유 페이지를 중복으로 셉니다)
+# - 기본 페이로드는 '정상' 상태라 LLM 호출 없이 모델 추론 경로만 측정합니다.
+#
+# 실행 예시: python bench_workers.py --workers 1 2 4 --duration 10
+import argparse
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+import requests
+
+NORMAL_PAYLOAD = {"RMS": 0.08, "Std_Dev": 0.07, "Max_Amp": 0.4, "Kurtosis": 3.1, "Skewness": 0.05}
+
+
+def client_loop(args):
+    """(클라이언트 프로세스) duration 동안 요청을 반복하고 성공 건수를 반환합니다."""
+    url, duration, payload = args
+    session = requests.Session()
+    ok = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        try:
+            if session.post(url, json=payload, timeout=10).status_code == 200:
+                ok += 1
+        except requests.RequestException:
+            pass
+    return ok
+
+
+def child_pids(pid):
+    pids = []
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{tid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    return pids
+
+
+def memory_kb(pid):
+    """/proc/<pid>/smaps_rollup에서 RSS/PSS(kB)를 읽습니다. (Linux 전용)"""
+    mem = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                mem[key] = int(rest.split()[0])
+    return mem
+
+
+def wait_ready(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(base_url + "/ready", timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("서버가 시간 안에 뜨지 않았습니다.")
+
+
+def bench(n_workers, port, duration, clients):
+    here = os.path.dirname(os.path.abspath(__file__))
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(n_workers), "--port", str(port)],
+        cwd=here, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url)
+        # 서로 다른 입력으로 호출해야 결과 캐시에 걸리지 않습니다.
+        jobs = []
+        for i in range(clients):
+            payload = dict(NORMAL_PAYLOAD, Skewness=0.05 + i * 1e-4)
+            jobs.append((base_url + "/diagnose", duration, payload))
+        with Pool(clients) as pool:
+            total = sum(pool.map(client_loop, jobs))
+
+        # 부하 이후(페이지가 실제로 touch 된 뒤) 워커 메모리를 측정합니다.
+        # 캐시 서버 프로세스는 모델 로드 전에 fork 되어 훨씬 작으므로 RSS 상위 n개만 워커로 봅니다.
+        mems = sorted((memory_kb(p) for p in child_pids(server.pid)), key=lambda m: m["Rss"], reverse=True)[:n_workers]
+        parent = memory_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    rss = sum(m["Rss"] for m in mems) / len(mems) / 1024
+    pss = sum(m["Pss"] for m in mems) / len(mems) / 1024
+    return total / duration, rss, pss, parent["Pss"] / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pre-fork 멀티 워커 벤치마크")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=8, help="부하 생성 클라이언트 프로세스 수")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} | {'req/s':>8} | {'RSS/worker(MB)':>14} | {'PSS/worker(MB)':>14} | {'parent PSS(MB)':>14}")
+    print("-" * 70)
+    for n in args.workers:
+        rps, rss, pss, parent_pss = bench(n, args.port, args.duration, args.clients)
+        print(f"{n:>7} | {rps:>8.1f} | {rss:>14.1f} | {pss:>14.1f} | {parent_pss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import html
+import time
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 
 # ==========================================
@@ -12,7 +16,41 @@ st.set_page_config(
 )
 
 # 백엔드 API 주소 (main.py가 실행 중이어야 함)
-API_URL = "http://127.0.0.1:8000/diagnose"
+API_BASE = "http://127.0.0.1:8000"
+API_URL = f"{API_BASE}/diagnose"
+
+# Fleet 현황 자동 갱신 주기(초)
+FLEET_REFRESH_SEC = 5
+
+# ==========================================
+# 1-1. HTTP 연결 재사용 / 응답 캐시
+# ==========================================
+@st.cache_resource
+def get_session():
+    """
+    백엔드와의 HTTP 연결을 재사용하는 세션 (Streamlit 프로세스 전체에서 1개).
+    requests.post를 매번 새로 부르면 요청마다 TCP 연결을 새로 맺습니다.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
+
+class DiagnoseError(Exception):
+    """백엔드가 진단 결과 대신 오류를 돌려준 경우 (캐시하지 않기 위해 예외로 알림)"""
+
+@st.cache_data(ttl=300, show_spinner=False)
+def post_diagnose(payload_items):
+    """
+    같은 입력값으로 다시 누르면 백엔드를 부르지 않고 직전 결과를 씁니다. (서버 결과 캐시와 같은 5분)
+    st.cache_data는 예외를 캐시하지 않으므로, 실패 응답은 예외로 올려 다음 클릭 때 다시 요청하게 합니다.
+    """
+    response = get_session().post(API_URL, json=dict(payload_items), timeout=120)
+    if response.status_code != 200:
+        raise DiagnoseError(f"서버 오류 발생: {response.status_code}")
+    result = response.json()
+    if "error" in result:  # 모델 미로드 등 (200 + {"error": ...})
+        raise DiagnoseError(f"서버 오류 발생: {result['error']}")
+    return result
 
 # ==========================================
 # 2. 메인 타이틀 및 헤더
@@ -24,6 +62,103 @@ st.markdown("""
 """)
 st.markdown("---")
 
+# ==========================================
+# 2-1. Fleet 현황 (다수 베어링 한눈에 보기)
+# ==========================================
+STATUS_STYLE = {  # 상태 코드 → (표시 이름, 글자/테두리 색, 배경색)
+    0: ("정상", "#2e7d32", "#e8f5e9"),
+    1: ("주의", "#ef6c00", "#fff3e0"),
+    2: ("위험", "#c62828", "#ffebee"),
+}
+
+GRID_CSS = """
+<style>
+.fleet-grid {display: grid; grid-template-columns: repeat(auto-fill, minmax(110px, 1fr)); gap: 6px;}
+.fleet-tile {border: 2px solid; border-radius: 6px; padding: 4px 6px; font-size: 0.8rem; line-height: 1.3;}
+.fleet-tile b {display: block; overflow: hidden; text-overflow: ellipsis; white-space: nowrap;}
+</style>
+"""
+
+def sync_fleet():
+    """
+    /fleet에서 마지막으로 받은 version 이후의 변경분만 받아 세션의 Fleet 사본에 합칩니다.
+    ETag(If-None-Match)가 같으면 서버는 304(본문 없음)를 돌려줍니다. 반환: 바뀐 베어링 수
+    """
+    fleet = st.session_state.setdefault('fleet', {"boot_id": None, "version": 0, "etag": None,
+                                                  "bearings": {}, "summary": {}, "tiles": {}})
+    headers = {"If-None-Match": fleet["etag"]} if fleet["etag"] else {}
+    response = get_session().get(f"{API_BASE}/fleet", params={"since": fleet["version"]}, headers=headers, timeout=5)
+    if response.status_code == 304:
+        return 0
+    response.raise_for_status()
+    body = response.json()
+
+    if fleet["boot_id"] is not None and (body["boot_id"] != fleet["boot_id"] or body["version"] < fleet["version"]):
+        # 서버가 재시작되어 version이 처음부터 다시 시작됨 → 사본을 비우고 전체를 다시 받습니다.
+        del st.session_state['fleet']
+        return sync_fleet()
+
+    for entry in body["bearings"]:
+        fleet["bearings"][entry["bearing"]] = entry
+    fleet.update(boot_id=body["boot_id"], version=body["version"], etag=response.headers.get("ETag"),
+                 summary=body["summary"])
+    return len(body["bearings"])
+
+def tile_html(entry):
+    label, color, background = STATUS_STYLE[entry["status_code"]]
+    return (f'<div class="fleet-tile" style="border-color:{color};background:{background}" '
+            f'title="RMS {entry["RMS"]:.3f} g / Kurtosis {entry["Kurtosis"]:.2f}">'
+            f'<b>{html.escape(entry["bearing"])}</b>'
+            f'<span style="color:{color}">{label}</span> · {entry["rul_hours"]:.0f} h</div>')
+
+def render_grid(statuses):
+    """
+    전체 타일을 HTML 하나로 만듭니다. (베어링 수백 개를 위젯 수백 개로 그리면 느림)
+    타일 HTML은 베어링별 version과 함께 보관하므로, 바뀐 베어링의 타일만 다시 만듭니다.
+    """
+    fleet = st.session_state['fleet']
+    tiles = fleet["tiles"]
+    for bearing, entry in fleet["bearings"].items():
+        cached = tiles.get(bearing)
+        if cached is None or cached[0] != entry["version"]:
+            tiles[bearing] = (entry["version"], tile_html(entry))
+    # 위험 → 주의 → 정상, 같은 상태에서는 잔존 수명이 짧은 순
+    shown = sorted((e for e in fleet["bearings"].values() if e["status_code"] in statuses),
+                   key=lambda e: (-e["status_code"], e["rul_hours"]))
+    return GRID_CSS + '<div class="fleet-grid">' + "".join(tiles[e["bearing"]][1] for e in shown) + '</div>'
+
+@st.fragment(run_every=FLEET_REFRESH_SEC)
+def fleet_view():
+    """이 영역만 주기적으로 다시 실행됩니다. (페이지 전체를 다시 그리지 않음)"""
+    t0 = time.perf_counter()
+    try:
+        changed = sync_fleet()
+    except requests.exceptions.RequestException as e:
+        st.error(f"⚠️ Fleet 현황을 가져오지 못했습니다: {e}")
+        return
+    fleet = st.session_state['fleet']
+    summary = fleet["summary"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("전체 베어링", len(fleet["bearings"]))
+    col2.metric("정상", summary.get("normal", 0))
+    col3.metric("주의", summary.get("warning", 0))
+    col4.metric("위험", summary.get("failure", 0))
+
+    labels = {v[0]: k for k, v in STATUS_STYLE.items()}
+    selected = st.session_state.get('fleet_filter', list(labels))
+    st.markdown(render_grid({labels[s] for s in selected}), unsafe_allow_html=True)
+    st.caption(f"version {fleet['version']} • 변경 {changed}개 • 갱신 {(time.perf_counter() - t0) * 1000:.0f} ms "
+               f"• {FLEET_REFRESH_SEC}초마다 자동 갱신")
+
+page = st.sidebar.radio("화면 선택", ["단일 베어링 진단", "Fleet 현황"], horizontal=True)
+if page == "Fleet 현황":
+    st.sidebar.multiselect("표시할 상태", [v[0] for v in STATUS_STYLE.values()],
+                           default=[v[0] for v in STATUS_STYLE.values()], key='fleet_filter')
+    st.sidebar.caption("`/diagnose` 요청에 bearing_id를 넣어 진단한 베어링이 표시됩니다.")
+    fleet_view()
+    st.stop()
+
 # ==========================================
 # 3. 사이드바 (데이터 입력 패널)
 # ==========================================
@@ -63,15 +198,12 @@ if predict_btn:
     
     try:
         with st.spinner('AI가 데이터를 분석하고 정비 지시서를 작성 중입니다...'):
-            # 백엔드 호출
-            response = requests.post(API_URL, json=payload)
-            
-            if response.status_code == 200:
-                result = response.json()
-                st.session_state['result'] = result # 결과 세션에 저장 (새로고침 방지)
-            else:
-                st.error(f"서버 오류 발생: {response.status_code}")
+            # 백엔드 호출 (연결 재사용 + 같은 입력이면 캐시된 결과 사용)
+            result = post_diagnose(tuple(sorted(payload.items())))
+            st.session_state['result'] = result # 결과 세션에 저장 (새로고침 방지)
                 
+    except DiagnoseError as e:
+        st.error(str(e))
     except requests.exceptions.ConnectionError:
         st.error("⚠️ 백엔드 서버에 연결할 수 없습니다. 터미널에서 `uvicorn main:app --reload`를 실행했는지 확인해주세요.")
 
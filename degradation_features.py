@@ -0,0 +1,122 @@
+# degradation_features.py
+# 열화 추세(trend) 특징: 이동 평균, 기울기, EWMA
+# - 07_train_rul.py의 원래 입력은 스냅샷 하나의 순간 특징 5개뿐이라, 모델이 "얼마나 빨리 나빠지는 중인지"를 볼 수 없었습니다.
+# - add_degradation_features(): 시간 순 특징량 테이블에서 베어링별로 추세 특징을 한 번에(벡터 연산) 계산합니다. (학습용)
+# - DegradationState: 같은 특징을 스냅샷이 하나씩 들어올 때마다 갱신하는 상태 객체입니다. (서빙용)
+#   · 최근 max(WINDOWS)개 값과 EWMA 몇 개만 들고 있으므로 이력이 길어져도 메모리가 일정합니다.
+#   · 계산 정의가 학습 쪽과 같으므로 학습/추론 특징이 일치합니다. (수명 초반 창이 덜 찼을 때도 같은 방식으로 처리)
+# - 누적합(누적 에너지 등)은 넣지 않습니다. 운전 시간에 비례해 커지므로 모델이 이를 "경과 시간"으로 외워 버리고,
+#   이력이 끊긴(재시작 등) 베어링을 새 베어링으로 오판하게 됩니다. 모든 특징은 최근 창/EWMA만으로 정해집니다.
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from signal_features import FEATURES
+
+TREND_SOURCES = ("RMS", "Kurtosis")   # 추세를 볼 특징
+WINDOWS = (10, 50)                    # 이동 창 크기 (스냅샷 수, 10분 간격 기준 약 1.7시간 / 8시간)
+EWM_ALPHA = 0.1                       # EWMA 평활 계수 (클수록 최근 값에 민감)
+MIN_HISTORY = max(WINDOWS)            # 추세 특징을 믿을 수 있는 최소 스냅샷 수 (가장 긴 창이 찬 시점)
+
+
+def feature_names():
+    """RUL 모델 입력 컬럼 순서 (순간 특징 5개 + 추세 특징)"""
+    names = list(FEATURES)
+    for f in TREND_SOURCES:
+        for w in WINDOWS:
+            names += [f"{f}_mean{w}", f"{f}_slope{w}"]
+        names.append(f"{f}_ewm")
+    return names
+
+
+def _slope(n, s_y, s_jy, j_end):
+    """
+    연속된 n개 점(위치 j_end-n+1 ... j_end)에 대한 최소제곱 기울기 (스냅샷 1개당 변화량)
+    Σj, Σj² 는 닫힌 식으로 계산하고, 분모 n·Σj² - (Σj)² = n²(n²-1)/12 를 씁니다. 점이 1개면 0.
+    """
+    s_j = n * (2 * j_end - n + 1) / 2.0
+    denom = n * n * (n * n - 1) / 12.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(n > 1, (n * s_jy - s_j * s_y) / np.where(n > 1, denom, 1.0), 0.0)
+
+
+# ==========================================
+# 1. 학습용: 테이블 전체 일괄 계산
+# ==========================================
+def add_degradation_features(df, bearing_col="bearing", order_col="filename"):
+    """
+    특징량 테이블에 추세 특징 컬럼을 추가해 반환합니다. (행 순서는 입력과 동일)
+    - bearing 컬럼이 있으면 베어링별로, 없으면 테이블 전체를 베어링 하나로 봅니다.
+    - order_col(파일명 = 측정 시각) 순서로 정렬한 뒤 계산합니다.
+    """
+    df = df.copy()
+    keys = df[bearing_col] if bearing_col in df.columns else pd.Series(0, index=df.index)
+    order = df.assign(_key=keys).sort_values(["_key"] + ([order_col] if order_col in df.columns else []),
+                                             kind="stable").index
+    ordered = df.loc[order]
+    key = keys.loc[order]
+
+    grouped = ordered.groupby(key, sort=False)
+    j = grouped.cumcount().to_numpy(dtype=np.float64)     # 베어링 안에서의 시간 순번
+
+    for f in TREND_SOURCES:
+        y = ordered[f].astype(np.float64)
+        jy = pd.Series(j * y.to_numpy(), index=ordered.index)
+        for w in WINDOWS:
+            # 창이 덜 찬 수명 초반(min_periods=1)은 있는 점만으로 계산 → DegradationState와 동일
+            n = np.minimum(j + 1, w)
+            s_y = y.groupby(key, sort=False).rolling(w, min_periods=1).sum().to_numpy()
+            s_jy = jy.groupby(key, sort=False).rolling(w, min_periods=1).sum().to_numpy()
+            ordered[f"{f}_mean{w}"] = s_y / n
+            ordered[f"{f}_slope{w}"] = _slope(n, s_y, s_jy, j)
+        ordered[f"{f}_ewm"] = y.groupby(key, sort=False).transform(
+            lambda s: s.ewm(alpha=EWM_ALPHA, adjust=False).mean())
+
+    return ordered.loc[df.index]
+
+
+# ==========================================
+# 2. 서빙용: 스냅샷 단위 증분 계산
+# ==========================================
+class DegradationState:
+    """
+    베어링 하나의 추세 특징 상태. update()에 스냅샷 특징(dict 또는 속성 객체)을 시간 순으로 넣으면
+    add_degradation_features와 같은 정의의 특징 dict(feature_names() 전체)를 돌려줍니다.
+    pickle 가능하므로 shared_cache에 그대로 저장할 수 있습니다.
+    학습은 스냅샷(10분 간격 측정) 1개 = 1행이므로, timestamp(측정 시각)를 주면 마지막으로 반영한 시각보다
+    새롭지 않은 스냅샷(재시도, 같은 스냅샷 반복 전송, 잦은 폴링)은 반영하지 않고 직전 특징을 그대로 돌려줍니다.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.recent = {f: deque(maxlen=max(WINDOWS)) for f in TREND_SOURCES}
+        self.ewm = {}
+        self.last_time = None
+        self.last_row = None
+
+    def update(self, snapshot, timestamp=None):
+        if timestamp is not None and self.last_time is not None and timestamp <= self.last_time:
+            return dict(self.last_row)
+        get = snapshot.get if isinstance(snapshot, dict) else lambda k: getattr(snapshot, k)
+        row = {f: float(get(f)) for f in FEATURES}
+
+        for f in TREND_SOURCES:
+            x = row[f]
+            self.recent[f].append(x)
+            values = np.asarray(self.recent[f], dtype=np.float64)
+            for w in WINDOWS:
+                y = values[-w:]
+                n = len(y)
+                pos = np.arange(n, dtype=np.float64)      # 기울기는 위치를 평행이동해도 같으므로 0부터 셉니다.
+                row[f"{f}_mean{w}"] = float(y.sum() / n)
+                row[f"{f}_slope{w}"] = float(_slope(n, y.sum(), (pos * y).sum(), n - 1))
+            prev = self.ewm.get(f)
+            self.ewm[f] = x if prev is None else EWM_ALPHA * x + (1 - EWM_ALPHA) * prev
+            row[f"{f}_ewm"] = self.ewm[f]
+
+        self.count += 1
+        if timestamp is not None:
+            self.last_time = timestamp
+        self.last_row = row
+        return dict(row)
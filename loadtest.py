@@ -0,0 +1,191 @@
+# loadtest.py
+# /diagnose 엔드 투 엔드 부하 테스트 (오프라인, 리눅스 1대에서 실행)
+# 1) Groq/임베딩/Pinecone 대역 서버(loadtest_stubs.py)를 별도 프로세스로 띄우고
+# 2) 그 서버들을 바라보도록 환경변수를 넣어 serve.py로 진단 서버를 띄운 뒤
+# 3) 정상/주의/위험 페이로드를 섞어 목표 요청률(open-loop)로 /diagnose를 호출하고
+# 4) p50/p95/p99 지연, 처리량, 오류율과 대역 서버가 실제로 주입한 오류 수를 출력합니다.
+#    (기본은 Groq SDK 재시도를 꺼서(--llm-retries 0) 주입한 오류율이 리포트 실패율에 그대로 나타나게 합니다)
+#
+# ※ 학습된 모델 파일(scaler.pkl, svm_model.pkl, xgboost_rul.pkl)이 현재 폴더에 있어야 합니다.
+# 실행 예시: python loadtest.py --rate 20 --duration 30 --llm-latency 800 --error-rate 0.02
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process
+
+import numpy as np
+import requests
+
+import loadtest_stubs
+
+# 상태별 대표 특징값 (NASA 2nd_test Bearing 1 구간별 평균 근처) + 요청마다 약간의 랜덤 변동
+SCENARIOS = {
+    "Normal":  {"RMS": 0.075, "Std_Dev": 0.074, "Max_Amp": 0.45, "Kurtosis": 3.1, "Skewness": 0.05},
+    "Warning": {"RMS": 0.25,  "Std_Dev": 0.24,  "Max_Amp": 1.2,  "Kurtosis": 3.8, "Skewness": 0.10},
+    "Failure": {"RMS": 0.55,  "Std_Dev": 0.54,  "Max_Amp": 3.5,  "Kurtosis": 7.5, "Skewness": 0.30},
+}
+
+
+def make_payload(scenario, rng):
+    # 매 요청 값이 달라야 결과 캐시(shared_cache)에 걸리지 않고 실제 경로를 탑니다.
+    base = SCENARIOS[scenario]
+    return {k: float(v * rng.uniform(0.95, 1.05)) for k, v in base.items()}
+
+
+def run_stubs(ports, latencies, jitter, error_rate):
+    """(별도 프로세스) 대역 서버 3개를 띄우고 계속 대기합니다."""
+    for kind, port in ports.items():
+        latency = latencies[kind]
+        loadtest_stubs.start_stub(kind, port, latency, latency * jitter, error_rate)
+    while True:
+        time.sleep(3600)
+
+
+def wait_ready(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            return requests.get(base_url + "/ready", params={"warm": "true"}, timeout=5).json()
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("진단 서버가 시간 안에 뜨지 않았습니다.")
+
+
+def drive(url, rate, duration, mix, concurrency, seed):
+    """
+    open-loop 부하: 요청을 '예정 시각'에 맞춰 보내고, 지연은 예정 시각부터 잽니다.
+    (서버가 느려져도 보내는 속도를 줄이지 않으므로 대기열 지연이 결과에 그대로 반영됩니다)
+    """
+    rng = random.Random(seed)
+    local = threading.local()
+    results = []  # (시나리오, 지연(s), 성공 여부, 리포트 실패 여부)
+    lock = threading.Lock()
+
+    def one(scheduled, scenario, payload):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        degraded = False
+        try:
+            resp = session.post(url, json=payload, timeout=60)
+            body = resp.json() if resp.status_code == 200 else {}
+            ok = resp.status_code == 200 and "error" not in body
+            # 서버는 LLM 오류를 잡아서 200으로 응답하므로, 리포트 실패는 따로 집계합니다.
+            degraded = ok and body.get("ai_report", "").startswith("❌")
+        except (requests.RequestException, ValueError):
+            ok = False
+        with lock:
+            results.append((scenario, time.perf_counter() - scheduled, ok, degraded))
+
+    names, weights = zip(*mix.items())
+    n_total = int(rate * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(n_total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            scenario = rng.choices(names, weights)[0]
+            pool.submit(one, scheduled, scenario, make_payload(scenario, rng))
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def stub_stats(ports):
+    """대역 서버별 누적 통계 (조회 실패 시 None)"""
+    stats = {}
+    for kind, port in ports.items():
+        try:
+            stats[kind] = loadtest_stubs.fetch_stats(f"http://127.0.0.1:{port}")
+        except OSError:
+            stats[kind] = None
+    return stats
+
+
+def report_injected(before, after):
+    """부하 구간 동안 대역 서버가 받은 요청 수 / 주입한 오류 수"""
+    print("대역 서버 오류 주입 (부하 구간):")
+    for kind in after:
+        if before.get(kind) is None or after[kind] is None:
+            print(f"  {kind:<10} 통계 조회 실패")
+            continue
+        n = after[kind]["requests"] - before[kind]["requests"]
+        e = after[kind]["injected_errors"] - before[kind]["injected_errors"]
+        print(f"  {kind:<10} 요청 {n:<6} 주입 오류 {e:<5} ({100 * e / max(n, 1):.2f}%)")
+    print("-" * 50)
+
+
+def report(results, elapsed, target_rate):
+    lat = np.array([r[1] for r in results]) * 1000
+    ok = np.array([r[2] for r in results])
+    degraded = np.array([r[3] for r in results])
+    print("-" * 50)
+    print(f"목표 요청률: {target_rate:.1f} req/s, 완료: {len(results)}건 / {elapsed:.1f}s")
+    print(f"처리량(성공): {ok.sum() / elapsed:.1f} req/s")
+    print(f"오류율: {100 * (1 - ok.mean()):.2f}%  (LLM 리포트 실패: {100 * degraded.mean():.2f}%)")
+    print(f"지연(ms)  p50={np.percentile(lat, 50):.1f}  p95={np.percentile(lat, 95):.1f}  p99={np.percentile(lat, 99):.1f}  max={lat.max():.1f}")
+    print("-" * 50)
+    for scenario in SCENARIOS:
+        sel = np.array([r[0] == scenario for r in results])
+        if sel.any():
+            print(f"  {scenario:<8} n={sel.sum():<6} p50={np.percentile(lat[sel], 50):8.1f}  "
+                  f"p99={np.percentile(lat[sel], 99):8.1f}  오류율={100 * (1 - ok[sel].mean()):.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/diagnose 오프라인 부하 테스트")
+    parser.add_argument("--rate", type=float, default=20.0, help="목표 요청률 (req/s)")
+    parser.add_argument("--duration", type=float, default=30.0, help="부하 시간 (s)")
+    parser.add_argument("--mix", type=float, nargs=3, default=[0.6, 0.3, 0.1], metavar=("NORMAL", "WARNING", "FAILURE"))
+    parser.add_argument("--workers", type=int, default=2, help="진단 서버 워커 수")
+    parser.add_argument("--concurrency", type=int, default=256, help="동시에 열어둘 최대 요청 수")
+    parser.add_argument("--llm-latency", type=float, default=800.0, help="LLM 대역 평균 지연 (ms)")
+    parser.add_argument("--embedding-latency", type=float, default=60.0)
+    parser.add_argument("--vector-latency", type=float, default=40.0)
+    parser.add_argument("--jitter", type=float, default=0.2, help="지연 표준편차 (평균 대비 비율)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="대역 서버 오류 주입 비율")
+    parser.add_argument("--llm-retries", type=int, default=0,
+                        help="Groq SDK 재시도 횟수 (0: 주입 오류가 그대로 드러남, 2: 운영 기본값)")
+    parser.add_argument("--port", type=int, default=8800, help="진단 서버 포트 (대역 서버는 +1, +2, +3)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    ports = {"llm": args.port + 1, "embedding": args.port + 2, "vector": args.port + 3}
+    latencies = {"llm": args.llm_latency, "embedding": args.embedding_latency, "vector": args.vector_latency}
+    stubs = Process(target=run_stubs, args=(ports, latencies, args.jitter, args.error_rate), daemon=True)
+    stubs.start()
+
+    env = dict(os.environ, **loadtest_stubs.stub_env({k: f"http://127.0.0.1:{p}" for k, p in ports.items()},
+                                                          args.llm_retries))
+    here = os.path.dirname(os.path.abspath(__file__))
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(args.workers), "--port", str(args.port)],
+        cwd=here, env=env, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        ready = wait_ready(base_url)
+        print(f"🔎 서버 준비 상태: {ready}")
+        if not ready.get("ready"):
+            print("⚠️ 모델이 로드되지 않았습니다. 모든 요청이 오류로 집계됩니다.")
+
+        mix = dict(zip(SCENARIOS, args.mix))
+        print(f"🚀 부하 시작: {args.rate} req/s × {args.duration}s, 구성={mix}")
+        before = stub_stats(ports)
+        results, elapsed = drive(base_url + "/diagnose", args.rate, args.duration, mix, args.concurrency, args.seed)
+        report(results, elapsed, args.rate)
+        report_injected(before, stub_stats(ports))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stubs.terminate()
+
+
+if __name__ == "__main__":
+    main()
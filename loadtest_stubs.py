@@ -0,0 +1,174 @@
+# loadtest_stubs.py
+# 부하 테스트용 로컬 대역(Stand-in) 서버
+# - 실제 Groq(LLM), Google(임베딩), Pinecone(벡터 DB) API 대신 같은 응답 형식을 돌려주는 가짜 서버입니다.
+# - API마다 응답 지연(latency)과 오류율(error rate)을 따로 설정할 수 있어, 외부 API가 느리거나
+#   불안정할 때 /diagnose가 어떻게 버티는지 오프라인에서 재현할 수 있습니다.
+# - GET /stats: 지금까지 받은 요청 수와 실제로 주입한 오류 수. SDK 재시도가 오류를 흡수하더라도
+#   부하 테스트 리포트가 "대역 서버가 몇 건을 실패시켰는지"를 함께 보여줄 수 있습니다.
+#
+# 단독 실행 예시: python loadtest_stubs.py --llm-latency 800 --error-rate 0.02
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 768  # text-embedding-004 차원
+
+STUB_REPORT = (
+    "### 🚨 1. 진단 요약\n- 현재 상태: **(부하 테스트용 가짜 리포트)**\n\n"
+    "### 🛠️ 3. 조치 권고\n- **즉시 조치**: 베어링 점검"
+)
+STUB_MANUAL = "2. 항목: 첨도(Kurtosis) 급증 및 충격음 발생 (부하 테스트용 가짜 매뉴얼)"
+
+
+# ==========================================
+# 1. API별 응답 생성 (실제 API와 같은 JSON 구조)
+# ==========================================
+def llm_response(body):
+    # Groq(OpenAI 호환) POST /openai/v1/chat/completions
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": STUB_REPORT},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def embedding_response(body):
+    # Google Generative Language POST /v1beta/models/{model}:embedContent
+    return {"embedding": {"values": [random.random() for _ in range(EMBEDDING_DIM)]}}
+
+
+def vector_response(body):
+    # Pinecone 데이터 플레인 POST /query
+    top_k = int(body.get("topK", 1))
+    return {
+        "matches": [
+            {"id": f"vec_{i}", "score": 0.9 - 0.1 * i, "values": [], "metadata": {"text": STUB_MANUAL}}
+            for i in range(top_k)
+        ],
+        "namespace": "",
+        "usage": {"readUnits": 1},
+    }
+
+
+RESPONDERS = {"llm": llm_response, "embedding": embedding_response, "vector": vector_response}
+
+
+# ==========================================
+# 2. 지연/오류를 흉내내는 HTTP 서버
+# ==========================================
+def make_handler(kind, latency_ms, jitter_ms, error_rate):
+    respond = RESPONDERS[kind]
+    stats = {"requests": 0, "injected_errors": 0}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive 지원 (SDK들이 커넥션을 재사용)
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self._send(404, {"error": {"message": "not found", "code": 404}})
+                return
+            with lock:
+                self._send(200, dict(stats))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                body = {}
+
+            # 설정된 지연 (정규분포 지터, 음수 방지)
+            delay = max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000
+            time.sleep(delay)
+
+            failed = random.random() < error_rate
+            with lock:
+                stats["requests"] += 1
+                stats["injected_errors"] += failed
+            if failed:
+                self._send(503, {"error": {"message": "stub: injected failure", "code": 503}})
+            else:
+                self._send(200, respond(body))
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass  # 부하 테스트 중 로그 출력 억제
+
+    return StubHandler
+
+
+def start_stub(kind, port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0):
+    """
+    가짜 API 서버를 백그라운드 스레드로 띄우고 (server, base_url)을 반환합니다.
+    port=0이면 비어있는 포트를 자동으로 잡습니다.
+    """
+    handler = make_handler(kind, latency_ms, jitter_ms, error_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stub_env(urls, llm_retries=None):
+    """
+    main.py / rag_system.py가 가짜 서버를 바라보도록 하는 환경변수를 만듭니다.
+    llm_retries를 주면 Groq SDK 재시도 횟수도 정합니다. (0이면 주입한 오류가 재시도에 흡수되지 않고 그대로 드러남)
+    """
+    env = {
+        "GROQ_BASE_URL": urls["llm"],
+        "GENAI_API_ENDPOINT": urls["embedding"],
+        "PINECONE_INDEX_HOST": urls["vector"],
+    }
+    if llm_retries is not None:
+        env["GROQ_MAX_RETRIES"] = str(llm_retries)
+    return env
+
+
+def fetch_stats(base_url):
+    """대역 서버의 누적 통계 {"requests": n, "injected_errors": m}"""
+    with urllib.request.urlopen(base_url + "/stats", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Groq / Google 임베딩 / Pinecone 대역 서버")
+    parser.add_argument("--llm-latency", type=float, default=500.0, help="LLM 평균 지연(ms)")
+    parser.add_argument("--embedding-latency", type=float, default=50.0)
+    parser.add_argument("--vector-latency", type=float, default=30.0)
+    parser.add_argument("--jitter", type=float, default=0.2, help="지연의 표준편차 (평균 대비 비율)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    latencies = {"llm": args.llm_latency, "embedding": args.embedding_latency, "vector": args.vector_latency}
+    urls = {}
+    for kind, latency in latencies.items():
+        _, urls[kind] = start_stub(kind, 0, latency, latency * args.jitter, args.error_rate)
+
+    print("✅ 대역 서버 실행 중. 아래 환경변수로 서비스를 띄우세요:")
+    for key, value in stub_env(urls).items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
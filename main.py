@@ -1,11 +1,23 @@
 # main.py
 # 필요한 라이브러리 임포트
-from fastapi import FastAPI               # 웹 서버 프레임워크
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request      # 웹 서버 프레임워크
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel            # 데이터 구조 정의 및 유효성 검사
 import joblib                             # 학습된 머신러닝 모델 로드
-from groq import Groq                     # Groq(Llama-3) API 클라이언트
 import numpy as np                        # 수치 연산
-from rag_system import query_manual       # (직접 만든) RAG 매뉴얼 검색 모듈
+from typing import Optional
+import json
+import os
+import secrets
+import threading
+import time
+import rag_system                         # (직접 만든) RAG 매뉴얼 검색 모듈
+from rag_system import query_manual
+from shared_cache import get_cache        # 워커 간 공유 결과 캐시 (serve.py 멀티 워커 모드)
+
+# ※ groq / pinecone / google.generativeai 같은 무거운 SDK는 여기서 import 하지 않습니다.
+#    워커 기동 속도를 위해 실제로 처음 필요해지는 순간(get_llm_client 등)에 불러옵니다.
 
 # ==========================================
 # 🔑 API 키 및 클라이언트 설정
@@ -13,37 +25,92 @@ from rag_system import query_manual       # (직접 만든) RAG 매뉴얼 검색
 # Groq Console에서 발급받은 키를 입력하세요.
 GROQ_API_KEY = "GROQ_API_KEY" 
 
-try:
-    client = Groq(api_key=GROQ_API_KEY)
-except Exception as e:
-    print(f"⚠️ Groq 클라이언트 설정 오류: {e}")
-    client = None
+# 외부 클라이언트 보관소 (최초 사용 시 1회 생성)
+clients = {}
+
+# 같은 입력에 대한 진단 결과(LLM 리포트 포함) 재사용 시간(초)
+RESULT_CACHE_TTL = 300
+
+# 베어링별 최신 진단 결과(Fleet 현황) 공유 캐시 키
+FLEET_PREFIX = "fleet:b:"
+FLEET_VERSION_KEY = "fleet_version"
+# 서버 기동마다 바뀌는 ID: version 카운터는 재시작하면 0부터 다시 세므로 ETag/응답에 함께 넣어 구분합니다.
+# (serve.py는 fork 전에 main을 import 하므로 워커들이 같은 값을 공유)
+BOOT_ID = secrets.token_hex(4)
+
+def get_llm_client():
+    """Groq 클라이언트를 처음 호출될 때 생성하고, 이후에는 재사용합니다."""
+    if 'groq' not in clients:
+        try:
+            from groq import Groq
+            # GROQ_MAX_RETRIES: SDK 자동 재시도 횟수 (기본 2). 부하 테스트는 0으로 꺼서 주입한 오류를 그대로 집계합니다.
+            clients['groq'] = Groq(api_key=GROQ_API_KEY, max_retries=int(os.environ.get("GROQ_MAX_RETRIES", "2")))
+        except Exception as e:
+            print(f"⚠️ Groq 클라이언트 설정 오류: {e}")
+            clients['groq'] = None
+    return clients['groq']
 
 # ==========================================
 # 1. FastAPI 앱 초기화
 # ==========================================
+@asynccontextmanager
+async def lifespan(app):
+    # 서버가 뜨자마자 백그라운드 스레드에서 모델을 로드합니다. (요청 수신은 바로 시작, 로드가 끝나면 /ready가 200)
+    # serve.py처럼 fork 전에 이미 로드했다면 스레드는 곧바로 끝납니다. 외부 SDK/네트워크 연결은 계속 최초 사용 시점에 합니다.
+    threading.Thread(target=load_models, daemon=True).start()
+    yield
+
 app = FastAPI(
     title="NASA Bearing AI System (SPC Hybrid)",
     description="통계적 공정 관리(SPC) + SVM + XGBoost 하이브리드 진단 시스템",
-    version="4.5.0" # Final Version
+    version="4.5.0", # Final Version
+    lifespan=lifespan,
 )
 
+# (선택) 온디맨드 프로파일링: BEARING_PROFILE_TOKEN이 설정된 경우에만 켜집니다. (꺼져 있으면 오버헤드 0)
+# - `X-Profile-Token: <토큰>` 헤더를 붙인 /diagnose 요청을 샘플링 프로파일러로 측정 → profiles/*.folded
+# - 관리자 엔드포인트: GET/POST /admin/profile (무작위 샘플링 비율 설정), GET /admin/profile/{파일명}
+PROFILE_TOKEN = os.environ.get("BEARING_PROFILE_TOKEN")
+if PROFILE_TOKEN:
+    from profiler import install_profiling
+    install_profiling(app, PROFILE_TOKEN)
+
 # ==========================================
-# 2. AI 모델 로드 (서버 시작 시 1회 실행)
+# 2. AI 모델 로드 (서버 기동 시 백그라운드에서 1회 실행)
 # ==========================================
 models = {} 
+models_lock = threading.Lock()
+
+def load_models():
+    """
+    학습된 모델(.pkl)을 한 번만 로드합니다.
+    joblib.load는 sklearn/xgboost를 함께 import 하므로 모듈 import 시점이 아니라
+    서버 기동(lifespan) 백그라운드 스레드 또는 serve.py의 fork 전 사전 로드에서 호출됩니다.
+    로드가 끝나기 전에 들어온 /diagnose는 기다리지 않고 503("models loading")을 돌려줍니다. (락은 스레드풀/백그라운드 스레드에서만 잡음)
+    """
+    with models_lock:
+        if models:
+            return models
 
-try:
-    # 1) 스케일러: 데이터 정규화용
-    models['scaler'] = joblib.load('scaler.pkl')
-    # 2) SVM: 패턴 분석 및 결함 유형 분류
-    models['svm'] = joblib.load('svm_model.pkl')
-    # 3) XGBoost: 잔존 수명(RUL) 회귀 예측
-    models['rul'] = joblib.load('xgboost_rul.pkl')
-    print("✅ 모든 ML 모델 로드 성공!")
-except Exception as e:
-    print(f"❌ 모델 로드 실패: {e}")
-    models['svm'] = None 
+        loaded = {}
+        try:
+            # 1) 스케일러: 데이터 정규화용
+            loaded['scaler'] = joblib.load('scaler.pkl')
+            # 2) SVM: 패턴 분석 및 결함 유형 분류
+            loaded['svm'] = joblib.load('svm_model.pkl')
+            # 3) XGBoost: 잔존 수명(RUL) 회귀 예측 - 기본 모델 (순간 특징 5개, 베어링 이력이 없을 때)
+            loaded['rul'] = joblib.load('xgboost_rul.pkl')
+            # 4) 추세 모델 + 입력 컬럼 순서 (07_train_rul.py가 만든 경우에만, 이력이 충분한 베어링에 사용)
+            if os.path.exists('xgboost_rul_trend.pkl') and os.path.exists('rul_features.pkl'):
+                loaded['rul_trend'] = joblib.load('xgboost_rul_trend.pkl')
+                loaded['rul_features'] = joblib.load('rul_features.pkl')
+            print("✅ 모든 ML 모델 로드 성공!")
+        except Exception as e:
+            print(f"❌ 모델 로드 실패: {e}")
+            loaded['svm'] = None
+        # 전부 읽은 뒤 한 번에 반영 → /ready가 로드 도중의 반쯤 찬 상태를 보지 않습니다.
+        models.update(loaded)
+    return models
 
 # ==========================================
 # 3. 입력 데이터 구조 정의
@@ -54,10 +121,44 @@ class VibrationData(BaseModel):
     Max_Amp: float      # 최대 진폭
     Kurtosis: float     # 첨도 (충격성, 초기 결함 핵심 지표)
     Skewness: float     # 비대칭도 (파형 왜곡)
+    bearing_id: Optional[str] = None  # (선택) 베어링 ID: 주면 이 베어링의 이전 스냅샷들로 추세 특징을 계산
+    timestamp: Optional[float] = None  # (선택) 스냅샷 측정 시각(epoch 초): 마지막 반영 시각보다 새롭지 않으면 추세 상태를 갱신하지 않음
+
+def rul_input(data):
+    """
+    RUL 예측에 쓸 (모델, 입력 행)을 고릅니다.
+    - bearing_id가 있으면 그 베어링의 DegradationState(공유 캐시의 고정 영역에 보관)를 이번 스냅샷으로 갱신하고,
+      누적 스냅샷이 MIN_HISTORY개 이상이면 추세 모델(xgboost_rul_trend.pkl)을 씁니다.
+      학습은 스냅샷 1개 = 1행이므로 timestamp를 함께 보내야 재시도/반복 전송이 새 스냅샷으로 세어지지 않습니다.
+    - 그 밖의 경우(bearing_id 없음, 서버 재시작 직후 등 이력 부족, 추세 모델 없음)는 순간 특징 5개 기본 모델을 씁니다.
+      이력 없이 추세 모델에 넣으면 "수명 초반 베어링"으로 보여 RUL이 크게 부풀려지기 때문입니다.
+    """
+    # 학습(07_train_rul.py)과 같은 정의의 특징. scipy를 함께 불러오므로 기동 속도를 위해 여기서 import 합니다.
+    from signal_features import FEATURES
+    base = [[getattr(data, name) for name in FEATURES]]
+    if data.bearing_id is None or 'rul_trend' not in models:
+        return models['rul'], base
+
+    from degradation_features import MIN_HISTORY
+    snapshot = {name: getattr(data, name) for name in FEATURES}
+    try:
+        # 읽기-갱신-저장을 캐시 서버 안에서 한 번에 처리 (ttl 없음 → 제거되지 않는 고정 영역)
+        row, count = get_cache().update_degradation(f"degradation:{data.bearing_id}", snapshot, data.timestamp)
+    except Exception as e:
+        print(f"⚠️ 추세 상태 갱신 실패, 기본 모델로 계산: {e}")
+        return models['rul'], base
+    if count < MIN_HISTORY:
+        return models['rul'], base
+    return models['rul_trend'], [[row[name] for name in models['rul_features']]]
 
 # ==========================================
 # 4. [핵심 알고리즘] 통계 기반 하이브리드 진단
 # ==========================================
+# 통계적 임계값 (Data-Driven Thresholds) - 진단(hybrid_diagnosis)과 매뉴얼 검색 질의(manual_query)가 함께 사용
+TH_STAT_WARNING = 0.18  # 주의 단계 진입점
+TH_STAT_FAILURE = 0.45  # 위험 단계 진입점
+TH_KURT_CRITICAL = 5.0  # 첨도(충격) 절대 임계값 (Crack 발생 징후)
+
 def hybrid_diagnosis(data, svm_pred, xgb_rul):
     """
     [설계 논리: Statistical Process Control (SPC)]
@@ -69,10 +170,7 @@ def hybrid_diagnosis(data, svm_pred, xgb_rul):
     - Failure (6-Sigma, 약 6.0배): 0.45g (확실한 물리적 파손)
     """
     
-    # 1. 통계적 임계값 (Data-Driven Thresholds)
-    TH_STAT_WARNING = 0.18  # 주의 단계 진입점
-    TH_STAT_FAILURE = 0.45  # 위험 단계 진입점
-    TH_KURT_CRITICAL = 5.0  # 첨도(충격) 절대 임계값 (Crack 발생 징후)
+    # 1. 통계적 임계값: 모듈 상단 TH_STAT_WARNING / TH_STAT_FAILURE / TH_KURT_CRITICAL
 
     # ---------------------------------------------------------
     # Step 1: 통계적 기준에 따른 1차 상태 분류 (1st Filter)
@@ -149,11 +247,25 @@ def hybrid_diagnosis(data, svm_pred, xgb_rul):
 # ==========================================
 # 5. Groq 기반 리포트 생성 함수
 # ==========================================
+def manual_query(status_text, data):
+    """
+    매뉴얼 검색 질의를 만듭니다. 측정값 숫자 대신 "어떤 지표가 어떤 수준인지"만 담으므로
+    같은 상황의 요청은 같은 질의가 되어 임베딩/검색 결과 캐시를 재사용합니다.
+    """
+    terms = [f"상태: {status_text}"]
+    if data.RMS >= TH_STAT_FAILURE:
+        terms.append("진동 RMS값 급증, 설비 파손 위험")
+    elif data.RMS >= TH_STAT_WARNING:
+        terms.append("진동 RMS값 상승")
+    if data.Kurtosis > TH_KURT_CRITICAL:
+        terms.append("첨도(Kurtosis) 급증 및 충격음 발생, 베어링 손상")
+    return ", ".join(terms)
+
 def generate_ai_report(status_text, rul, data):
-    # RAG 검색 (매뉴얼 찾기)
+    # RAG 검색 (매뉴얼 찾기: 벡터 + 키워드 하이브리드, 상위 3개 문단)
     try:
-        search_query = f"상태: {status_text}, RMS: {data.RMS}, Kurtosis: {data.Kurtosis}"
-        found_manuals = query_manual(search_query)
+        search_query = manual_query(status_text, data)
+        found_manuals = query_manual(search_query, n_results=3)
         manual_context = "\n".join(found_manuals)
     except:
         manual_context = "관련 매뉴얼 없음. 일반 베어링 정비 지침을 따르세요."
@@ -193,6 +305,7 @@ def generate_ai_report(status_text, rul, data):
     
     try:
         # Groq 모델 호출 (최신 Llama-3 사용)
+        client = get_llm_client()
         completion = client.chat.completions.create(
             model="llama-3.3-70b-versatile", # or llama-3.1-70b-versatile
             messages=[
@@ -212,17 +325,34 @@ def generate_ai_report(status_text, rul, data):
 # ==========================================
 @app.post("/diagnose")
 async def diagnose_bearing(data: VibrationData):
-    # 모델 로드 확인
+    # 모델 로드 확인: 기동 직후 백그라운드 로드가 아직 진행 중이면 기다리지 않고 바로 503
+    # (async 핸들러에서 models_lock을 잡으면 이벤트 루프 전체가 멈춰 /ready까지 응답하지 못합니다)
+    if not models:
+        return JSONResponse(status_code=503, content={"error": "models loading"})
     if models['svm'] is None:
         return {"error": "Server Error: AI Models not loaded."}
 
+    # 같은 입력을 다른 워커가 이미 진단했다면 그 결과(LLM 리포트 포함)를 재사용
+    # (bearing_id가 있으면 결과가 그 베어링의 이력에 따라 달라지므로 재사용하지 않습니다)
+    # (timestamp는 추세 상태에만 쓰이므로 키에서 뺍니다)
+    cache_key = "diagnose:" + json.dumps(data.model_dump(exclude={'timestamp'}), sort_keys=True)
+    cached = None
+    if data.bearing_id is None:
+        try:
+            cached = get_cache().get(cache_key)
+        except Exception as e:
+            print(f"⚠️ 캐시 조회 실패: {e}")
+    if cached is not None:
+        return cached
+
     # (1) 데이터 전처리 & 스케일링
     features = [[data.RMS, data.Std_Dev, data.Max_Amp, data.Kurtosis, data.Skewness]]
     features_scaled = models['scaler'].transform(features)
     
     # (2) 모델 Raw 예측 (AI의 순수 의견)
     svm_raw = models['svm'].predict(features_scaled)[0] # 0, 1, 2
-    xgb_raw = models['rul'].predict(features)[0]        # 예측 시간
+    rul_model, rul_x = rul_input(data)   # 베어링 이력이 충분하면 추세 모델, 아니면 기본 모델
+    xgb_raw = rul_model.predict(rul_x)[0]  # 예측 시간
     
     # (3) [핵심] 하이브리드 로직 실행 (통계 + AI + RUL 동기화)
     final_status_code, final_rul = hybrid_diagnosis(data, svm_raw, xgb_raw)
@@ -238,11 +368,144 @@ async def diagnose_bearing(data: VibrationData):
         print(f"🤖 Groq 리포트 생성 요청... (Status: {status_text})")
         ai_message = generate_ai_report(status_text, final_rul, data)
 
-    # (6) 최종 결과 반환
-    return {
+    # (6) Fleet 현황 갱신 (bearing_id가 있을 때만)
+    if data.bearing_id is not None:
+        try:
+            get_cache().set_versioned(FLEET_PREFIX + data.bearing_id, {
+                "bearing": data.bearing_id,
+                "status_code": int(final_status_code),
+                "rul_hours": float(final_rul),
+                "RMS": data.RMS,
+                "Kurtosis": data.Kurtosis,
+                "updated_at": time.time(),
+            }, FLEET_VERSION_KEY)
+        except Exception as e:
+            print(f"⚠️ Fleet 현황 갱신 실패: {e}")
+
+    # (7) 최종 결과 반환
+    result = {
         "status": status_text,
         "rul_hours": final_rul,
         "ai_report": ai_message
     }
+    if data.bearing_id is None:
+        try:
+            get_cache().set(cache_key, result, ttl=RESULT_CACHE_TTL)
+        except Exception as e:
+            print(f"⚠️ 캐시 저장 실패: {e}")
+    return result
+
+# ==========================================
+# 7. 준비 상태(Readiness) 엔드포인트
+# ==========================================
+@app.get("/ready")
+def readiness(warm: bool = False):
+    """
+    각 백엔드가 이미 준비(warm)되어 있는지 보고합니다.
+    - 모델은 서버 기동 시 백그라운드에서 로드되므로, 로드가 끝나면 warm 없이도 200이 됩니다.
+    - warm=true: 외부 클라이언트 연결까지 지금 수행한 뒤 결과를 보고합니다. (모델 로드 중이면 끝날 때까지 기다림)
+    모델이 준비되지 않았으면 503을 반환하여 로드밸런서가 트래픽을 보내지 않도록 합니다.
+    """
+    if warm:
+        load_models()
+        get_llm_client()
+        rag_system.warm_up()
+
+    backends = {
+        "models": models.get('svm') is not None,
+        "llm": clients.get('groq') is not None,
+        **rag_system.backend_status(),
+    }
+    ready = backends["models"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "backends": backends},
+    )
+
+# ==========================================
+# 8. 트렌드 조회 엔드포인트 (대시보드 그래프용)
+# ==========================================
+trend_store = {}
+
+def get_trend_pyramid():
+    """트렌드 피라미드를 처음 호출될 때 엽니다. (trend_pyramid는 pandas를 함께 불러오므로 기동 속도를 위해 여기서 import)"""
+    if 'pyramid' not in trend_store:
+        from trend_pyramid import TrendPyramid
+        trend_store['pyramid'] = TrendPyramid()
+    return trend_store['pyramid']
+
+@app.get("/trend")
+def read_trend(bearing: str = "B1", feature: str = "RMS",
+               start: float = None, end: float = None, points: int = 1000):
+    """
+    [start, end] (epoch 초) 구간의 특징 트렌드를 points개 안팎으로 요약해 반환합니다.
+    구간 길이에 맞는 해상도 레벨을 자동으로 고르므로, 어떤 줌에서도 응답 크기/시간이 일정하고
+    min/max가 함께 오므로 순간 피크가 사라지지 않습니다.
+    """
+    trend = get_trend_pyramid().read(bearing, feature, start, end, max_points=max(1, min(points, 10000)))
+    return {
+        "bearing": bearing,
+        "feature": feature,
+        "level": trend["level"],
+        "t": trend["t0"].tolist(),
+        "min": trend["min"].tolist(),
+        "max": trend["max"].tolist(),
+        "mean": trend["mean"].tolist(),
+    }
+
+# ==========================================
+# 9. 유사 과거 사례 검색 엔드포인트
+# ==========================================
+case_index = {}
+
+def get_case_index():
+    """유사 사례 인덱스(similar_cases.pkl, 없으면 최종 데이터셋으로 생성)를 처음 호출될 때 1회 로드합니다."""
+    if 'index' not in case_index:
+        from similar_cases import load_index  # scipy를 함께 불러오므로 기동 속도를 위해 여기서 import
+        case_index['index'] = load_index()
+    return case_index['index']
+
+@app.post("/similar")
+def similar_cases(data: VibrationData, k: int = 5):
+    """
+    입력 스냅샷과 특징 공간(06_train_svm.py의 스케일러 기준)에서 가장 가까운 과거 스냅샷 k개를 반환합니다.
+    각 사례의 베어링, 측정 시각, 라벨, 그 시점의 잔존 수명(RUL = 그 뒤로 실제 버틴 시간)을 함께 돌려줍니다.
+    """
+    try:
+        index = get_case_index()
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"error": f"유사 사례 인덱스 로드 실패: {e}"})
+    return {"cases": index.query(data.model_dump(), k=max(1, min(k, 100)))}
+
+# ==========================================
+# 10. Fleet 현황 엔드포인트 (다수 베어링 대시보드용)
+# ==========================================
+@app.get("/fleet")
+def fleet_overview(request: Request, since: int = 0):
+    """
+    bearing_id와 함께 진단된 모든 베어링의 최신 상태/RUL을 한 번에 반환합니다.
+    - since: 클라이언트가 마지막으로 받은 version. 그 이후 바뀐 베어링만 보냅니다. (0이면 전체)
+    - ETag = 기동 ID + 현재 version. If-None-Match가 같고 since도 현재 version이면 본문 없이 304를 돌려줍니다. (바뀐 것이 없음)
+    - boot_id가 바뀌었으면 서버가 재시작된 것이므로 클라이언트는 사본을 버리고 since=0으로 다시 받아야 합니다.
+    """
+    cache = get_cache()
+    # version을 먼저 읽고 항목을 읽습니다. (사이에 갱신이 끼어도 다음 since 요청에서 다시 받으므로 누락 없음)
+    version = cache.get(FLEET_VERSION_KEY, 0)
+    etag = f'"{BOOT_ID}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag and since == version:
+        return Response(status_code=304, headers=headers)
+
+    entries = list(cache.items(FLEET_PREFIX).values())
+    summary = {"normal": 0, "warning": 0, "failure": 0}
+    for e in entries:
+        summary[("normal", "warning", "failure")[e["status_code"]]] += 1
+    changed = sorted((e for e in entries if e["version"] > since), key=lambda e: e["bearing"])
+    return JSONResponse(
+        content={"boot_id": BOOT_ID, "version": version, "since": since, "total": len(entries),
+                 "summary": summary, "bearings": changed},
+        headers=headers,
+    )
 
-# 실행 명령어: uvicorn main:app --reload
\ No newline at end of file
+# 실행 명령어: uvicorn main:app --reload
+# 멀티 워커 실행: python serve.py --workers 4  (모델을 fork 전에 1회 로드하여 워커끼리 공유)
\ No newline at end of file
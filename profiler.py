@@ -0,0 +1,182 @@
+# profiler.py
+# 진단 서비스용 온디맨드 샘플링 프로파일러
+# - 요청을 처리하는 스레드의 콜스택을 일정 간격으로 훔쳐보고(sys._current_frames) 횟수를 셉니다.
+#   코드에 계측(instrumentation)을 넣지 않으므로 sklearn/xgboost 추론, hybrid_diagnosis,
+#   query_manual, LLM 클라이언트 호출 등 요청 경로의 모든 함수가 자동으로 잡힙니다.
+# - 결과는 flamegraph.pl / speedscope에 바로 넣을 수 있는 "folded stack" 형식으로 저장합니다.
+# - main.py는 BEARING_PROFILE_TOKEN 환경변수가 있을 때만 install_profiling()을 호출합니다.
+#   (꺼져 있으면 미들웨어 자체가 등록되지 않으므로 오버헤드 0)
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+# 요약(X-Profile-Summary)에 포함시킬 관심 함수들
+WATCHED_FUNCTIONS = ("diagnose_bearing", "hybrid_diagnosis", "generate_ai_report", "query_manual",
+                     "transform", "predict", "create")
+
+
+# ==========================================
+# 1. 샘플링 프로파일러
+# ==========================================
+class SamplingProfiler:
+    """지정한 스레드의 콜스택을 interval 초마다 샘플링합니다."""
+
+    def __init__(self, thread_id, interval=0.001, max_depth=128):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = None
+        self.duration = 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """flamegraph 입력 형식: '프레임;프레임;... 횟수' 한 줄에 한 스택"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def summary(self, names=WATCHED_FUNCTIONS):
+        """관심 함수별 포함(inclusive) 샘플 비율(%)"""
+        total = sum(self.stacks.values()) or 1
+        share = {}
+        for name in names:
+            hits = sum(c for s, c in self.stacks.items() if any(f.endswith(":" + name) for f in s.split(";")))
+            if hits:
+                share[name] = round(100.0 * hits / total, 1)
+        return share
+
+
+# ==========================================
+# 2. ASGI 미들웨어 (선택된 요청만 프로파일링)
+# ==========================================
+class ProfilingMiddleware:
+    """
+    프로파일링 대상 요청:
+    - 헤더 `X-Profile-Token: <토큰>` 이 붙은 요청
+    - 또는 /admin/profile 로 설정한 sample_rate 확률로 뽑힌 요청
+    sample_rate는 워커 프로세스별 설정입니다. (serve.py 멀티 워커에서는 워커마다 따로 설정됨)
+    """
+
+    def __init__(self, app, settings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.settings["paths"]:
+            return await self.app(scope, receive, send)
+
+        token = dict(scope["headers"]).get(b"x-profile-token", b"")
+        # 상수 시간 비교 (응답 시간 차이로 토큰을 한 글자씩 알아낼 수 없도록)
+        requested = bool(token) and hmac.compare_digest(token, self.settings["token"].encode())
+        sampled = self.settings["sample_rate"] > 0 and random.random() < self.settings["sample_rate"]
+        if not (requested or sampled):
+            return await self.app(scope, receive, send)
+
+        # async 엔드포인트는 이벤트 루프 스레드(= 지금 이 스레드)에서 실행됩니다.
+        profiler = SamplingProfiler(threading.get_ident(), self.settings["interval"])
+        profiler.start()
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                profiler.stop()
+                name = save_profile(profiler, self.settings["dir"])
+                summary = ",".join(f"{k}={v}%" for k, v in profiler.summary().items())
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-file", name.encode()),
+                    (b"x-profile-summary", summary.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
+
+
+def save_profile(profiler, directory):
+    os.makedirs(directory, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{random.randrange(16 ** 6):06x}.folded"
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        f.write(f"# duration_ms={profiler.duration * 1000:.1f} samples={sum(profiler.stacks.values())}\n")
+        f.write(profiler.folded())
+    return name
+
+
+# ==========================================
+# 3. 설치 함수 + 관리자 엔드포인트
+# ==========================================
+def install_profiling(app, token, paths=("/diagnose",), interval=0.001, directory=None):
+    settings = {
+        "token": token,
+        "paths": set(paths),
+        "interval": interval,
+        "sample_rate": 0.0,
+        "dir": directory or os.environ.get("BEARING_PROFILE_DIR", "profiles"),
+    }
+    app.add_middleware(ProfilingMiddleware, settings=settings)
+
+    router = APIRouter(prefix="/admin/profile")
+
+    def check(x_profile_token):
+        if x_profile_token is None or not hmac.compare_digest(x_profile_token.encode(), token.encode()):
+            raise HTTPException(status_code=403, detail="invalid profile token")
+
+    @router.get("")
+    def profile_status(x_profile_token: str = Header(None)):
+        check(x_profile_token)
+        files = sorted(os.listdir(settings["dir"])) if os.path.isdir(settings["dir"]) else []
+        return {"sample_rate": settings["sample_rate"], "interval_ms": settings["interval"] * 1000,
+                "pid": os.getpid(), "profiles": files[-50:]}
+
+    @router.post("")
+    def profile_config(sample_rate: float = 0.0, interval_ms: float = None,
+                       x_profile_token: str = Header(None)):
+        check(x_profile_token)
+        settings["sample_rate"] = min(max(sample_rate, 0.0), 1.0)
+        if interval_ms:
+            settings["interval"] = max(interval_ms, 0.1) / 1000
+        return {"sample_rate": settings["sample_rate"], "interval_ms": settings["interval"] * 1000}
+
+    @router.get("/{name}", response_class=PlainTextResponse)
+    def profile_download(name: str, x_profile_token: str = Header(None)):
+        check(x_profile_token)
+        path = os.path.join(settings["dir"], os.path.basename(name))
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="profile not found")
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    app.include_router(router)
+    return settings
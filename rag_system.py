@@ -1,6 +1,13 @@
-from pinecone import Pinecone
-import google.generativeai as genai
+import glob
+import math
+import os
+import re
 import time
+from collections import Counter
+from functools import lru_cache
+
+# ※ pinecone / google.generativeai 는 import 비용이 크고, 연결 시 네트워크가 필요합니다.
+#    모듈 import 시점에는 아무것도 연결하지 않고, 첫 검색(또는 업로드) 때 연결합니다.
 
 # ==========================================
 # 🔑 API 키 입력 (2개 다 필요합니다!)
@@ -8,29 +15,87 @@ import time
 GROQ_API_KEY = "GROQ_API_KEY"
 PINECONE_API_KEY = "PINECONE_API_KEY"
 
-genai.configure(api_key=GROQ_API_KEY)
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-# 인덱스 연결 (이름이 사이트와 똑같아야 함)
+# 인덱스 이름 (이름이 사이트와 똑같아야 함)
 index_name = "bearing-manual" 
-index = pc.Index(index_name)
+
+# (선택) 엔드포인트 재지정: 부하 테스트 시 로컬 대역 서버(loadtest_stubs.py)를 바라보게 합니다.
+# - GENAI_API_ENDPOINT : 임베딩 API 주소 (예: http://127.0.0.1:9001)
+# - PINECONE_INDEX_HOST: Pinecone 인덱스 호스트 (예: http://127.0.0.1:9002)
+# (Groq는 SDK가 GROQ_BASE_URL 환경변수를 직접 읽습니다.)
+GENAI_API_ENDPOINT = os.environ.get("GENAI_API_ENDPOINT")
+PINECONE_INDEX_HOST = os.environ.get("PINECONE_INDEX_HOST")
+
+# 외부 백엔드 보관소 (최초 사용 시 1회 생성)
+_backends = {}
+
+# 검색 설정
+EMBED_MODEL = "models/text-embedding-004"
+MANUAL_FILES = ["manual.txt"] + sorted(glob.glob(os.path.join("manuals", "*.txt")))  # 추가 매뉴얼은 manuals/*.txt
+QUERY_CACHE_SIZE = 1024   # 질의 임베딩 / 벡터 검색 결과 LRU 캐시 크기
+RRF_K = 60                # Reciprocal Rank Fusion 상수 (순위 1위와 10위의 가중치 차이를 완만하게)
+VECTOR_RETRY_AFTER = 30.0 # 벡터 검색 실패 후 이 시간(초) 동안은 호출하지 않고 키워드 검색만 사용
+
+# 벡터 검색(임베딩 API + Pinecone) 장애 시각. lru_cache는 예외를 캐시하지 않으므로 직접 기억해 둡니다.
+_vector_backoff = {"until": 0.0}
+
+def get_genai():
+    """임베딩용 google.generativeai 모듈을 처음 필요할 때 불러와 설정합니다."""
+    if 'genai' not in _backends:
+        import google.generativeai as genai
+        if GENAI_API_ENDPOINT:
+            genai.configure(api_key=GROQ_API_KEY, transport="rest",
+                            client_options={"api_endpoint": GENAI_API_ENDPOINT})
+        else:
+            genai.configure(api_key=GROQ_API_KEY)
+        _backends['genai'] = genai
+    return _backends['genai']
+
+def get_index():
+    """Pinecone 인덱스 연결을 처음 필요할 때 엽니다."""
+    if 'index' not in _backends:
+        from pinecone import Pinecone
+        pc = Pinecone(api_key=PINECONE_API_KEY)
+        if PINECONE_INDEX_HOST:
+            _backends['index'] = pc.Index(host=PINECONE_INDEX_HOST)
+        else:
+            _backends['index'] = pc.Index(index_name)
+    return _backends['index']
+
+def warm_up():
+    """임베딩/벡터 DB 백엔드를 미리 연결하고 키워드 색인을 만듭니다. 실패해도 서버는 계속 동작합니다."""
+    for name, getter in (("embedding", get_genai), ("vector_db", get_index), ("lexical", get_lexical)):
+        try:
+            getter()
+        except Exception as e:
+            print(f"⚠️ {name} 백엔드 연결 실패: {e}")
+
+def backend_status():
+    """각 백엔드가 이미 연결(warm)되어 있는지 반환합니다."""
+    return {
+        "embedding": 'genai' in _backends,
+        "vector_db": 'index' in _backends,
+        "lexical": 'lexical' in _backends,
+    }
 
 # 1. 매뉴얼 로드 및 클라우드 DB 업로드
 def load_manual_to_db():
     try:
-        with open("manual.txt", "r", encoding="utf-8") as f:
-            text = f.read()
-        
-        # 문단 나누기
-        chunks = [c for c in text.split("\n\n") if c.strip()]
+        # 문단 나누기 (manual.txt + manuals/*.txt, 키워드 검색과 같은 문단 기준)
+        chunks = load_chunks()
         
+        genai = get_genai()
+        index = get_index()
+        # 매뉴얼이 바뀌므로 이전 검색 결과 캐시와 키워드 색인은 버립니다.
+        _vector_search.cache_clear()
+        _backends.pop('lexical', None)
+
         print(f"☁️ 클라우드(Pinecone)에 {len(chunks)}개 데이터 업로드를 시작합니다...")
         
         vectors = []
         for i, chunk in enumerate(chunks):
             # 구글 모델(768차원)로 임베딩
             embedding = genai.embed_content(
-                model="models/text-embedding-004",
+                model=EMBED_MODEL,
                 content=chunk,
                 task_type="retrieval_document"
             )['embedding']
@@ -50,21 +115,121 @@ def load_manual_to_db():
     except Exception as e:
         print(f"❌ 업로드 실패: {e}")
 
-# 2. 검색 함수
-def query_manual(query_text, n_results=1):
-    # 질문도 똑같은 768차원으로 변환
-    query_vec = genai.embed_content(
-        model="models/text-embedding-004",
-        content=query_text,
+# 2. 질의 정규화 + 임베딩/벡터 검색 캐시
+def normalize_query(query_text):
+    """
+    질의에서 의미 없는 부분(측정값 숫자, 구두점, 공백 차이)을 지워 같은 의미의 질의가 같은 문자열이 되도록 합니다.
+    예: "상태: 주의 (Warning), RMS: 0.2314" → "상태 주의 warning rms"
+    → 값이 조금씩 다른 요청도 같은 임베딩/검색 결과 캐시를 씁니다.
+    """
+    # 소수/지수 표기 측정값만 지웁니다. (정수는 부품 번호·규격 번호일 수 있으므로 남김: 6205, ISO 10816)
+    text = re.sub(r"[-+]?(\d*\.\d+|\d+(?=e))(e[-+]?\d+)?", " ", query_text.lower())
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _embed_query(normalized):
+    """정규화된 질의 → 768차원 임베딩 (LRU 캐시: 자주 쓰는 질의는 API를 다시 부르지 않음)"""
+    return tuple(get_genai().embed_content(
+        model=EMBED_MODEL,
+        content=normalized,
         task_type="retrieval_query"
-    )['embedding']
-    
-    # Pinecone에서 비슷한 내용 찾기
-    res = index.query(vector=query_vec, top_k=n_results, include_metadata=True)
-    
-    if res['matches']:
-        return [match['metadata']['text'] for match in res['matches']]
-    return ["관련 매뉴얼 없음"]
+    )['embedding'])
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _vector_search(normalized, top_k):
+    """Pinecone 유사도 검색 결과(문단 텍스트 목록, 가까운 순). 같은 질의는 캐시된 결과를 씁니다."""
+    res = get_index().query(vector=list(_embed_query(normalized)), top_k=top_k, include_metadata=True)
+    return tuple(match['metadata']['text'] for match in res['matches'])
+
+# 3. 키워드(BM25) 검색
+def tokenize(text):
+    """
+    영문/숫자는 단어 단위, 한글은 글자 2개씩 끊은 bigram으로 토큰화합니다.
+    (한글은 조사가 붙어 단어 형태가 바뀌므로 "첨도가"/"첨도" 모두 "첨도" bigram이 겹치도록)
+    """
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+|[가-힣]+", text.lower()):
+        if word[0] >= "가" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+class LexicalIndex:
+    """매뉴얼 문단의 메모리 역색인(토큰 → [(문단 번호, 빈도)]) + BM25 점수 계산"""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1, self.b = k1, b
+        self.postings = {}
+        self.lengths = []
+        for doc_id, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk))
+            self.lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append((doc_id, tf))
+        self.avg_len = sum(self.lengths) / max(len(chunks), 1)
+
+    def search(self, query_text, top_k=5):
+        """BM25 점수 상위 top_k개 문단 번호 (점수 높은 순). 질의 토큰이 들어 있는 문단만 계산합니다."""
+        n = len(self.chunks)
+        scores = {}
+        for token in set(tokenize(query_text)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / self.avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores, key=scores.get, reverse=True)[:top_k]
+
+def load_chunks(paths=None):
+    """매뉴얼 파일들을 문단(빈 줄 기준) 단위로 나눕니다. (load_manual_to_db와 같은 기준)"""
+    chunks = []
+    for path in paths or MANUAL_FILES:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                chunks.extend(c.strip() for c in f.read().split("\n\n") if c.strip())
+    return chunks
+
+def get_lexical():
+    """키워드 검색용 역색인을 처음 필요할 때 매뉴얼 파일로 만듭니다."""
+    if 'lexical' not in _backends:
+        _backends['lexical'] = LexicalIndex(load_chunks())
+    return _backends['lexical']
+
+# 4. 하이브리드 검색 (벡터 + 키워드 → RRF 융합)
+def query_manual(query_text, n_results=3):
+    """
+    질의와 관련된 매뉴얼 문단 n_results개를 반환합니다.
+    - 벡터 검색(의미 유사도)과 BM25 키워드 검색 결과를 Reciprocal Rank Fusion(순위 역수 합)으로 합칩니다.
+      점수 척도가 다른 두 검색을 순위만으로 합치므로 별도 가중치 조정이 필요 없습니다.
+    - 벡터 검색(외부 API)이 실패하면 키워드 검색 결과만으로 답하고, VECTOR_RETRY_AFTER초 동안은 벡터 검색을 건너뜁니다.
+      (장애 중에 요청마다 클라이언트 타임아웃을 다 기다리지 않도록)
+    """
+    normalized = normalize_query(query_text)
+    depth = max(n_results * 2, 5)
+    fused = {}
+
+    lexical = get_lexical()
+    for rank, doc_id in enumerate(lexical.search(normalized, depth)):
+        text = lexical.chunks[doc_id]
+        fused[text] = fused.get(text, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+    if time.monotonic() >= _vector_backoff["until"]:
+        try:
+            for rank, text in enumerate(_vector_search(normalized, depth)):
+                text = text.strip()
+                fused[text] = fused.get(text, 0.0) + 1.0 / (RRF_K + rank + 1)
+        except Exception as e:
+            _vector_backoff["until"] = time.monotonic() + VECTOR_RETRY_AFTER
+            print(f"⚠️ 벡터 검색 실패, {VECTOR_RETRY_AFTER:.0f}초 동안 키워드 검색 결과만 사용: {e}")
+
+    if not fused:
+        return ["관련 매뉴얼 없음"]
+    return sorted(fused, key=fused.get, reverse=True)[:n_results]
 
 if __name__ == "__main__":
     load_manual_to_db()
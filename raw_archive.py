@@ -0,0 +1,281 @@
+# raw_archive.py
+# 원시 진동 파형 압축 아카이브 (랜덤 액세스 지원)
+# - NASA 스냅샷 텍스트 파일(탭 구분, 20480행 x 4채널)은 실제 float 데이터보다 몇 배 큽니다.
+# - 스냅샷·채널마다 int16으로 양자화(스냅샷별 scale 저장)하고, 바이트 셔플 후 zlib로 따로 압축합니다.
+# - 파일 끝의 인덱스(시각, 채널, 오프셋)만 읽으면 원하는 스냅샷/채널 하나만 바로 찾아 풀 수 있습니다.
+#   (이웃 스냅샷을 풀 필요 없음)
+#
+# 파일 구조:
+#   [MAGIC 8B] [청크 ...] [인덱스 세그먼트] [파일명 JSON] [트레일러 40B] [청크 ...] [인덱스 세그먼트] ... [트레일러 40B]
+#   트레일러 = 이전 트레일러 끝 위치(첫 세그먼트면 0), 인덱스 시작 오프셋, 인덱스 레코드 수, 파일명 JSON 길이 (각 uint64) + MAGIC
+#
+# 증분 추가: 기존 내용은 건드리지 않고 새 청크 → 이번에 추가한 스냅샷의 인덱스/파일명만 담은 세그먼트 → 새 트레일러 순으로 덧붙입니다.
+#   추가 비용은 새 데이터 크기에만 비례합니다. (전체 인덱스를 다시 쓰지 않음)
+#   읽기 쪽은 마지막 트레일러에서 이전 트레일러를 따라가며 세그먼트들을 합칩니다.
+#   추가 도중 프로세스가 죽어도 이전 트레일러가 그대로 남아 있으므로, 파일 끝에서부터 앞뒤가 맞는 마지막 트레일러를 찾아 직전 상태로 엽니다.
+#
+# 변환 예시: python raw_archive.py ./data/2nd_test 2nd_test.braw
+import json
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from trend_pyramid import snapshot_time
+
+MAGIC = b"BRAW\x00\x02\x00\x00"
+TRAILER = struct.Struct("<QQQQ8s")
+
+INDEX = np.dtype([
+    ("time", "<f8"),        # 측정 시각 (epoch 초)
+    ("snapshot", "<u4"),    # 스냅샷 번호 (추가된 순서)
+    ("channel", "<u2"),     # 채널(베어링 센서) 번호
+    ("n_samples", "<u4"),
+    ("scale", "<f8"),       # 복원값 = int16 * scale
+    ("offset", "<u8"),      # 압축 청크 시작 위치
+    ("length", "<u8"),      # 압축 청크 길이
+])
+
+
+# ==========================================
+# 1. 양자화 + 압축 / 복원
+# ==========================================
+def encode_channel(signal, level=6):
+    """float 파형 → (scale, 압축 바이트)"""
+    signal = np.asarray(signal, dtype=np.float64)
+    peak = float(np.max(np.abs(signal))) if len(signal) else 0.0
+    scale = peak / 32767 if peak > 0 else 1.0
+    q = np.round(signal / scale).astype("<i2")
+    # 바이트 셔플: 하위 바이트들 → 상위 바이트들 순으로 재배치하면 zlib가 훨씬 잘 압축합니다.
+    raw = q.view(np.uint8).reshape(-1, 2)
+    shuffled = np.concatenate([raw[:, 0], raw[:, 1]])
+    return scale, zlib.compress(shuffled.tobytes(), level)
+
+
+def decode_channel(payload, n_samples, scale):
+    """압축 바이트 → float32 파형"""
+    shuffled = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+    raw = np.empty((n_samples, 2), dtype=np.uint8)
+    raw[:, 0] = shuffled[:n_samples]
+    raw[:, 1] = shuffled[n_samples:]
+    return raw.reshape(-1).view("<i2").astype(np.float32) * np.float32(scale)
+
+
+# ==========================================
+# 2. 쓰기 (새 파일 생성 또는 기존 아카이브에 추가)
+# ==========================================
+class ArchiveWriter:
+    """
+    with ArchiveWriter("2nd_test.braw") as w:
+        w.add("2004.02.12.10.32.39", time, signals)   # signals: (샘플 수, 채널 수)
+    기존 파일이면 마지막 트레일러 뒤에 이어서 쓰고, close 시 이번에 추가한 스냅샷의 인덱스 세그먼트만 기록합니다.
+    """
+
+    def __init__(self, path, level=6):
+        self.path = path
+        self.level = level
+        self.index = []
+        self.names = []
+        if os.path.exists(path):
+            reader = ArchiveReader(path)
+            self.prev_end = reader.end
+            self.base = len(reader)
+            self._known = set(reader.filenames)
+            reader.close()
+            self.f = open(path, "r+b")
+            # 유효한 마지막 트레일러 뒤(이전에 중단된 추가의 잔여물)만 잘라냅니다.
+            self.f.seek(self.prev_end)
+            self.f.truncate()
+        else:
+            self.prev_end = 0
+            self.base = 0
+            self._known = set()
+            self.f = open(path, "wb")
+            self.f.write(MAGIC)
+
+    def __contains__(self, filename):
+        return filename in self._known
+
+    def add(self, filename, time, signals):
+        signals = np.asarray(signals)
+        if signals.ndim == 1:
+            signals = signals[:, None]
+        snapshot = self.base + len(self.names)
+        rows = np.empty(signals.shape[1], dtype=INDEX)
+        for ch in range(signals.shape[1]):
+            scale, payload = encode_channel(signals[:, ch], self.level)
+            rows[ch] = (time, snapshot, ch, signals.shape[0], scale, self.f.tell(), len(payload))
+            self.f.write(payload)
+        self.index.append(rows)
+        self.names.append(filename)
+        self._known.add(filename)
+
+    def close(self):
+        # 추가한 것이 없으면 세그먼트를 만들지 않습니다. (새 파일은 빈 세그먼트 하나로 열 수 있게 함)
+        if self.names or not self.prev_end:
+            index = np.concatenate(self.index) if self.index else np.empty(0, dtype=INDEX)
+            names = json.dumps(self.names).encode("utf-8")
+            index_offset = self.f.tell()
+            self.f.write(index.tobytes())
+            self.f.write(names)
+            # 청크/인덱스가 디스크에 기록된 뒤에 트레일러를 씁니다. (트레일러만 먼저 남는 일이 없도록)
+            self.f.flush()
+            os.fsync(self.f.fileno())
+            self.f.write(TRAILER.pack(self.prev_end, index_offset, len(index), len(names), MAGIC))
+            self.f.flush()
+            os.fsync(self.f.fileno())
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==========================================
+# 3. 읽기 (스냅샷/채널 단위 랜덤 액세스)
+# ==========================================
+def _trailer_at(fd, end):
+    """end 위치에서 끝나는 트레일러가 앞뒤가 맞으면 (이전 트레일러 끝, 인덱스 오프셋, 레코드 수, 파일명 길이), 아니면 None"""
+    start = end - TRAILER.size
+    if start < len(MAGIC):
+        return None
+    prev_end, index_offset, n_index, names_len, magic = TRAILER.unpack(os.pread(fd, TRAILER.size, start))
+    if magic != MAGIC or index_offset < len(MAGIC) or prev_end > index_offset:
+        return None
+    if index_offset + n_index * INDEX.itemsize + names_len != start:
+        return None
+    return prev_end, index_offset, n_index, names_len
+
+
+def find_trailer(fd, size, block=1 << 20):
+    """
+    마지막 유효 트레일러 → (트레일러 끝 위치, 트레일러 값).
+    정상 종료된 파일은 파일 끝에서 바로 찾고, 추가 도중 중단된 파일만 뒤에서부터 MAGIC을 거슬러 찾습니다.
+    """
+    found = _trailer_at(fd, size)
+    if found:
+        return size, found
+    pos = size
+    while pos > len(MAGIC):
+        lo = max(0, pos - block)
+        buf = os.pread(fd, pos - lo, lo)
+        j = len(buf)
+        while (j := buf.rfind(MAGIC, 0, j + len(MAGIC) - 1)) >= 0:
+            found = _trailer_at(fd, lo + j + len(MAGIC))
+            if found:
+                return lo + j + len(MAGIC), found
+        if lo == 0:
+            break
+        pos = lo + len(MAGIC) - 1      # 블록 경계에 걸친 MAGIC도 찾도록 조금 겹쳐 읽습니다.
+    return None
+
+
+class ArchiveReader:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "rb")
+        fd = self.f.fileno()
+        located = find_trailer(fd, os.fstat(fd).st_size)
+        if located is None:
+            self.f.close()
+            raise ValueError(f"{path}: 아카이브 형식이 아닙니다.")
+        self.end, trailer = located
+
+        # 마지막 트레일러부터 이전 트레일러를 따라가며 세그먼트를 모은 뒤, 추가된 순서로 합칩니다.
+        segments = []
+        while True:
+            prev_end, index_offset, n_index, names_len = trailer
+            index = np.frombuffer(os.pread(fd, n_index * INDEX.itemsize, index_offset), dtype=INDEX)
+            names = json.loads(os.pread(fd, names_len, index_offset + n_index * INDEX.itemsize).decode("utf-8"))
+            segments.append((index, names))
+            if not prev_end:
+                break
+            trailer = _trailer_at(fd, prev_end)
+            if trailer is None:
+                self.f.close()
+                raise ValueError(f"{path}: 인덱스 세그먼트 연결이 깨졌습니다. (위치 {prev_end})")
+        segments.reverse()
+        self.index = np.concatenate([seg[0] for seg in segments])
+        self.filenames = [name for seg in segments for name in seg[1]]
+        n_index = len(self.index)
+        self.n_channels = int(self.index["channel"].max()) + 1 if n_index else 0
+        # (스냅샷, 채널) → 인덱스 행 번호
+        self._row = {(int(s), int(c)): i for i, (s, c) in enumerate(zip(self.index["snapshot"], self.index["channel"]))}
+        self._by_name = {name: i for i, name in enumerate(self.filenames)}
+        self.times = np.zeros(len(self.filenames))
+        self.times[self.index["snapshot"]] = self.index["time"]
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def read(self, snapshot, channel=None):
+        """
+        스냅샷 하나를 읽습니다. snapshot은 번호(int) 또는 파일명(str).
+        channel을 주면 그 채널만 (1차원), 생략하면 모든 채널 (샘플 수, 채널 수)을 반환합니다.
+        """
+        if isinstance(snapshot, str):
+            snapshot = self._by_name[snapshot]
+        if channel is not None:
+            return self._read_row(self._row[(snapshot, channel)])
+        return np.stack([self._read_row(self._row[(snapshot, ch)]) for ch in range(self.n_channels)], axis=1)
+
+    def _read_row(self, i):
+        entry = self.index[i]
+        # os.pread: 파일 위치를 공유하지 않으므로 여러 스레드에서 동시에 읽어도 안전합니다.
+        payload = os.pread(self.f.fileno(), int(entry["length"]), int(entry["offset"]))
+        return decode_channel(payload, int(entry["n_samples"]), float(entry["scale"]))
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==========================================
+# 4. 변환기: NASA 탭 구분 텍스트 폴더 → 아카이브
+# ==========================================
+def read_snapshot_file(file_path):
+    """03_create_dataset.py와 같은 방식으로 스냅샷 텍스트 파일을 읽습니다. (탭 구분, 헤더 없음)"""
+    return pd.read_csv(file_path, sep='\t', header=None).to_numpy()
+
+
+def convert_directory(data_dir, archive_path, level=6):
+    """
+    폴더의 스냅샷 파일들을 아카이브에 추가합니다. 이미 들어있는 파일은 건너뛰므로
+    새 스냅샷이 쌓일 때마다 다시 실행하면 증분으로 추가됩니다.
+    """
+    filenames = sorted(f for f in os.listdir(data_dir)
+                       if not f.startswith('.') and not os.path.isdir(os.path.join(data_dir, f)))
+    raw_bytes = 0
+    added = 0
+    with ArchiveWriter(archive_path, level) as writer:
+        new = [f for f in filenames if f not in writer]
+        times = snapshot_time(new) if new else []
+        for filename, t in zip(new, times):
+            file_path = os.path.join(data_dir, filename)
+            writer.add(filename, t, read_snapshot_file(file_path))
+            raw_bytes += os.path.getsize(file_path)
+            added += 1
+            if added % 100 == 0:
+                print(f"✅ {added}개 스냅샷 압축 완료...")
+
+    archive_bytes = os.path.getsize(archive_path)
+    print(f"🎉 {added}개 스냅샷 추가 (전체 {len(filenames)}개)")
+    if raw_bytes:
+        print(f"   원본(이번 추가분) {raw_bytes / 1e6:.1f} MB → 아카이브 전체 {archive_bytes / 1e6:.1f} MB")
+    return added
+
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else './data/2nd_test/'
+    archive_path = sys.argv[2] if len(sys.argv) > 2 else '2nd_test.braw'
+    convert_directory(data_dir, archive_path)
@@ -0,0 +1,112 @@
+# serve.py
+# 멀티 워커(Pre-fork) 서빙 진입점
+# - `uvicorn main:app --workers N`은 워커마다 모델/SDK를 따로 로드하므로 메모리가 워커 수에 비례해 늘어납니다.
+# - 여기서는 부모 프로세스가 모델을 "한 번만" 로드한 뒤 fork 하므로, 워커들은 읽기 전용 모델 메모리를
+#   Copy-on-Write 페이지로 공유합니다.
+# - 워커 간 결과 공유는 shared_cache(로컬 유닉스 소켓 캐시 서버)를 통해 이루어집니다.
+#
+# 실행 예시: python serve.py --workers 4 --port 8000
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import shared_cache
+
+
+def bind_socket(host, port, backlog=2048):
+    """모든 워커가 같이 accept 할 리스닝 소켓을 부모에서 미리 열어둡니다."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level):
+    """(자식 프로세스) 상속받은 소켓으로 uvicorn 서버를 실행합니다."""
+    import uvicorn
+
+    # 부모가 설치한 시그널 핸들러를 해제하고 uvicorn이 직접 처리하도록 합니다.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(app, sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(app, sock, log_level)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def serve(host="127.0.0.1", port=8000, workers=2, log_level="warning"):
+    sock = bind_socket(host, port)
+
+    # 1. 워커 간 공유 캐시 서버 시작 (환경변수로 주소가 워커에게 전달됨)
+    cache_manager = shared_cache.start_server()
+
+    # 2. 모델 사전 로드 (fork 전에 1회)
+    import main
+    main.load_models()
+
+    # 3. 지금까지 만든 객체들을 GC 대상에서 제외 → 워커에서 GC가 공유 페이지를 건드려 복사되는 것을 줄입니다.
+    gc.collect()
+    gc.freeze()
+
+    # 4. 워커 fork
+    pids = {spawn_worker(main.app, sock, log_level) for _ in range(workers)}
+    print(f"✅ {workers}개 워커 시작: http://{host}:{port} (pid: {sorted(pids)})")
+
+    stopping = False
+
+    def handle_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    # 5. 워커 감시: 비정상 종료된 워커는 다시 fork (모델은 이미 부모 메모리에 있으므로 즉시 기동)
+    while pids:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid not in pids:
+            continue
+        pids.discard(pid)
+        if not stopping:
+            print(f"⚠️ 워커 {pid} 종료 (status={status}) → 재시작")
+            time.sleep(0.5)
+            pids.add(spawn_worker(main.app, sock, log_level))
+
+    cache_manager.shutdown()
+    sock.close()
+    print("🛑 서버 종료")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="베어링 진단 서버 (pre-fork 멀티 워커)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.log_level)
+    sys.exit(0)
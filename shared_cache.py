@@ -0,0 +1,153 @@
+# shared_cache.py
+# 워커 프로세스끼리 결과를 공유하기 위한 캐시
+# - serve.py(멀티 워커 모드)가 로컬 유닉스 소켓으로 캐시 서버를 띄우고, 각 워커는 거기에 접속합니다.
+# - 단일 프로세스 실행(uvicorn main:app)에서는 같은 인터페이스의 프로세스 내부 캐시를 사용합니다.
+import os
+import secrets
+import tempfile
+import threading
+import time
+from multiprocessing import get_context
+from multiprocessing.managers import BaseManager
+
+# serve.py가 워커에게 캐시 서버 주소/인증키를 넘겨줄 때 쓰는 환경변수
+ENV_ADDRESS = "BEARING_CACHE_ADDR"
+ENV_AUTHKEY = "BEARING_CACHE_AUTHKEY"
+
+
+# ==========================================
+# 1. 캐시 저장소 (TTL 지원 dict)
+# ==========================================
+class CacheStore:
+    """
+    키-값 저장소. 캐시 서버 프로세스 안에서는 여러 워커의 요청을 스레드로 동시에 처리하므로 락을 겁니다.
+    메서드 한 번 호출 = 소켓 왕복 한 번이므로, 여러 키가 필요할 때는 items(prefix)로 한 번에 읽으세요.
+    - ttl을 준 항목(진단 결과 캐시 등): max_items를 넘으면 만료된 것 → 오래된 것 순으로 지워집니다.
+    - ttl이 없는 항목(Fleet 현황과 버전 번호, 베어링별 추세 상태): 별도 공간에 보관하며 절대 지우지 않습니다.
+      (개수 = 베어링 수 수준으로 정해져 있고, 사라지면 조용히 틀린 결과가 나오기 때문)
+    """
+
+    def __init__(self, max_items=10000):
+        self._data = {}      # ttl 항목: key -> (만료 시각, 값)
+        self._pinned = {}    # ttl 없는 항목: key -> 값 (제거 대상 아님)
+        self._lock = threading.Lock()
+        self.max_items = max_items
+
+    def _lookup(self, key, now):
+        if key in self._pinned:
+            return True, self._pinned[key]
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= now:
+            return False, None
+        return True, entry[1]
+
+    def get(self, key, default=None):
+        with self._lock:
+            found, value = self._lookup(key, time.time())
+            return value if found else default
+
+    def items(self, prefix=""):
+        now = time.time()
+        with self._lock:
+            out = {k: e[1] for k, e in self._data.items() if k.startswith(prefix) and e[0] > now}
+            out.update((k, v) for k, v in self._pinned.items() if k.startswith(prefix))
+            return out
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if not ttl:
+                self._data.pop(key, None)
+                self._pinned[key] = value
+                return
+            self._pinned.pop(key, None)
+            if len(self._data) >= self.max_items and key not in self._data:
+                self._evict()
+            self._data[key] = (time.time() + ttl, value)
+
+    def set_versioned(self, key, value, version_key):
+        """
+        version_key 카운터를 1 올리고, 그 번호를 value['version']에 넣어 저장합니다. (락 하나로 원자적 처리)
+        → 여러 워커가 동시에 갱신해도 번호 순서 = 저장 순서가 보장되므로, "since 번호 이후 변경분"만 안전하게 읽을 수 있습니다.
+        """
+        with self._lock:
+            version = self._pinned.get(version_key, 0) + 1
+            self._pinned[version_key] = version
+            self._pinned[key] = dict(value, version=version)
+            return version
+
+    def update_degradation(self, key, snapshot, timestamp=None):
+        """
+        베어링 추세 상태(DegradationState)를 락 안에서 읽고-갱신하고-저장합니다. → (추세 특징 dict, 누적 스냅샷 수)
+        get/set 두 번으로 나누면 같은 베어링을 두 워커가 동시에 처리할 때 한쪽 갱신이 사라지므로 한 번의 호출로 처리합니다.
+        timestamp가 마지막으로 반영한 시각보다 새롭지 않으면 상태를 바꾸지 않습니다.
+        """
+        # 추세 특징 모듈은 numpy/scipy를 함께 불러오므로 처음 필요할 때 import 합니다.
+        from degradation_features import DegradationState
+        with self._lock:
+            state = self._pinned.get(key)
+            if state is None:
+                state = self._pinned[key] = DegradationState()
+            row = state.update(snapshot, timestamp)
+            return row, state.count
+
+    def _evict(self):
+        # ttl 항목만 대상: 만료된 항목부터 지우고, 그래도 가득 차 있으면 가장 오래 들어온 항목을 지웁니다. (dict는 삽입 순서 유지)
+        now = time.time()
+        for k in [k for k, e in self._data.items() if e[0] <= now]:
+            del self._data[k]
+        while len(self._data) >= self.max_items:
+            del self._data[next(iter(self._data))]
+
+
+# ==========================================
+# 2. 캐시 서버 / 클라이언트 (로컬 소켓)
+# ==========================================
+_server_store = CacheStore()
+
+def _get_server_store():
+    return _server_store
+
+class _CacheManager(BaseManager):
+    pass
+
+_CacheManager.register("get_store", callable=_get_server_store)
+
+
+def start_server(address=None):
+    """
+    캐시 서버 프로세스를 시작하고, 워커가 접속할 수 있도록 환경변수를 설정합니다.
+    반환된 manager는 종료 시 shutdown() 해야 합니다.
+    """
+    if address is None:
+        address = os.path.join(tempfile.mkdtemp(prefix="bearing-cache-"), "cache.sock")
+    authkey = secrets.token_bytes(16)
+    manager = _CacheManager(address=address, authkey=authkey, ctx=get_context("fork"))
+    manager.start()
+    os.environ[ENV_ADDRESS] = address
+    os.environ[ENV_AUTHKEY] = authkey.hex()
+    return manager
+
+
+_cache = {}
+
+def get_cache():
+    """
+    현재 프로세스에서 사용할 캐시를 반환합니다. (최초 호출 시 1회 연결)
+    - 캐시 서버 환경변수가 있으면 → 워커 간 공유 캐시(프록시)
+    - 없으면 → 프로세스 내부 캐시
+    fork 이후에 처음 호출되어야 하므로 모듈 import 시점에는 연결하지 않습니다.
+    """
+    pid = os.getpid()
+    if _cache.get("pid") != pid:
+        address = os.environ.get(ENV_ADDRESS)
+        store = None
+        if address:
+            try:
+                manager = _CacheManager(address=address, authkey=bytes.fromhex(os.environ[ENV_AUTHKEY]))
+                manager.connect()
+                store = manager.get_store()
+            except Exception as e:
+                print(f"⚠️ 공유 캐시 연결 실패, 로컬 캐시 사용: {e}")
+        _cache["store"] = store if store is not None else CacheStore()
+        _cache["pid"] = pid
+    return _cache["store"]
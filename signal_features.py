@@ -0,0 +1,86 @@
+# signal_features.py
+# 진동 파형 → 시간 영역 특징량(RMS, 표준편차, 최대 진폭, 첨도, 왜도) 계산
+# - snapshot_features(): 스냅샷 전체를 5개 숫자로 요약 (03_create_dataset.py의 원래 계산과 동일)
+# - window_features(): 스냅샷 안을 겹치는 창(window/hop)으로 나눠 창마다 같은 5개 특징을 계산
+#   · 누적합(prefix sum)으로 창별 1~4차 모멘트를 한 번에 구하므로 창 개수만큼 복사하거나 루프를 돌지 않습니다.
+#   · 최대 진폭은 sliding_window_view(복사 없는 strided view) 위에서 바로 max를 구합니다.
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.stats import kurtosis, skew
+
+FEATURES = ['RMS', 'Std_Dev', 'Max_Amp', 'Kurtosis', 'Skewness']
+
+# 창 기본값: 2048샘플(약 0.1초 @20kHz), 절반 겹침 → 20480샘플 스냅샷당 19개 창
+WINDOW_SIZE = 2048
+HOP_SIZE = 1024
+
+
+def snapshot_features(signal):
+    """스냅샷 하나(1차원 파형) → 특징 5개 딕셔너리"""
+    signal = np.asarray(signal)
+    return {
+        # (1) RMS: 진동 에너지 크기
+        'RMS': np.sqrt(np.mean(signal**2)),
+        # (2) 표준편차: 평균 대비 퍼짐
+        'Std_Dev': np.std(signal),
+        # (3) 최대 진폭: 가장 큰 순간 충격
+        'Max_Amp': np.max(np.abs(signal)),
+        # (4) 첨도: 충격성(Impulse) 지표 (정규분포 = 0, Fisher 정의)
+        'Kurtosis': kurtosis(signal),
+        # (5) 왜도: 파형 비대칭
+        'Skewness': skew(signal),
+    }
+
+
+def window_features(signal, window=WINDOW_SIZE, hop=HOP_SIZE):
+    """
+    스냅샷 하나를 겹치는 창으로 나눠 창별 특징을 계산합니다.
+    반환: {'start': 창 시작 샘플 위치, 'RMS': ..., ...} (각 값은 창 개수 길이의 배열)
+    계산 정의는 snapshot_features와 같습니다. (std는 ddof=0, 첨도/왜도는 scipy 기본값 = 편향 보정 없음)
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    if n < window:
+        return {'start': np.empty(0, dtype=np.int64), **{f: np.empty(0) for f in FEATURES}}
+
+    starts = np.arange(0, n - window + 1, hop)
+
+    # 전체 평균을 먼저 빼두면 누적합 차이에서 생기는 자릿수 손실(catastrophic cancellation)이 줄어듭니다.
+    offset = signal.mean()
+    x = signal - offset
+
+    # 창별 거듭제곱 합: 누적합 배열 두 지점의 차이 (창마다 O(1))
+    def window_sum(values):
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        return csum[starts + window] - csum[starts]
+
+    x2 = x * x
+    s1 = window_sum(x) / window
+    s2 = window_sum(x2) / window
+    s3 = window_sum(x2 * x) / window
+    s4 = window_sum(x2 * x2) / window
+
+    # 원점 모멘트 → 창 평균 기준 중심 모멘트
+    m2 = np.maximum(s2 - s1**2, 0.0)
+    m3 = s3 - 3 * s1 * s2 + 2 * s1**3
+    m4 = s4 - 4 * s1 * s3 + 6 * s1**2 * s2 - 3 * s1**4
+
+    # 원래 신호 기준 평균제곱 (RMS는 평균을 빼지 않은 값)
+    mean = s1 + offset
+    mean_sq = m2 + mean**2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kur = np.where(m2 > 0, m4 / m2**2 - 3.0, np.nan)
+        skw = np.where(m2 > 0, m3 / m2**1.5, np.nan)
+
+    # 최대 진폭: |x|의 strided view(복사 없음)에서 hop 간격 창만 골라 최대값
+    peaks = sliding_window_view(np.abs(signal), window)[::hop].max(axis=1)
+
+    return {
+        'start': starts,
+        'RMS': np.sqrt(mean_sq),
+        'Std_Dev': np.sqrt(m2),
+        'Max_Amp': peaks,
+        'Kurtosis': kur,
+        'Skewness': skw,
+    }
@@ -0,0 +1,139 @@
+# similar_cases.py
+# "비슷한 과거 사례" 검색: 특징 벡터 최근접 이웃(k-NN) 인덱스
+# - 진단 결과가 주의/위험이면 현장에서는 "전에 이런 적이 있었나? 그 뒤로 얼마나 버텼나?"를 묻습니다.
+# - 과거 모든 스냅샷의 특징 5개를 06_train_svm.py의 StandardScaler로 스케일한 공간에 KD-트리(scipy cKDTree)로 색인합니다.
+#   질의 하나는 트리 탐색(로그 시간)이므로 수만~수십만 스냅샷에서도 1ms 미만입니다.
+# - 증분 추가: 새 스냅샷은 작은 버퍼에 쌓아 두고 질의 때 트리 결과와 함께 전수 비교합니다.
+#   버퍼가 REBUILD_SIZE를 넘으면 트리를 다시 만듭니다. (재구성 비용을 여러 번의 추가에 나눠 냄)
+#
+# 실행 예시: python similar_cases.py    (bearing_dataset_final.csv의 새 행을 인덱스에 추가하고 저장)
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from signal_features import FEATURES
+
+META = ['bearing', 'filename', 'time', 'Label', 'RUL']
+DEFAULT_PATH = "similar_cases.pkl"
+REBUILD_SIZE = 1024
+
+
+class CaseIndex:
+    def __init__(self, scaler):
+        self.scaler = scaler
+        self.points = np.empty((0, len(FEATURES)))      # 트리에 들어간 점 (스케일된 좌표)
+        self.meta = {col: np.empty(0, dtype=object) for col in META}   # 점 순서와 같은 순서의 메타데이터
+        self.tree = None
+        self.pending = []                                # 트리에 아직 안 들어간 점 (버퍼)
+        self.keys = set()                                # (bearing, filename) 중복 추가 방지
+
+    def __len__(self):
+        return len(self.meta['filename'])
+
+    def _scale(self, x):
+        # StandardScaler.transform과 같은 계산. 질의 1건에 DataFrame을 만들지 않도록 numpy로 직접 계산합니다.
+        return (np.asarray(x, dtype=np.float64) - self.scaler.mean_) / self.scaler.scale_
+
+    # ------------------------------------------
+    # 1. 추가
+    # ------------------------------------------
+    def add(self, df, default_bearing="B1"):
+        """
+        특징량 테이블(FEATURES + filename, Label, RUL)의 행을 인덱스에 추가합니다.
+        이미 들어 있는 (bearing, filename)은 건너뜁니다. 반환: 추가된 행 수
+        """
+        df = df.copy()
+        if 'bearing' not in df.columns:
+            df['bearing'] = default_bearing
+        for col in ('Label', 'RUL'):
+            if col not in df.columns:
+                df[col] = np.nan
+        keys = list(zip(df['bearing'].astype(str), df['filename'].astype(str)))
+        fresh = np.array([k not in self.keys for k in keys], dtype=bool)
+        if not fresh.any():
+            return 0
+        df = df[fresh].copy()
+        self.keys.update(k for k, new in zip(keys, fresh) if new)
+        # 측정 시각 문자열은 추가할 때 한 번만 만들어 둡니다.
+        times = pd.to_datetime(df['filename'], format="%Y.%m.%d.%H.%M.%S", errors="coerce")
+        df['time'] = times.dt.strftime("%Y-%m-%dT%H:%M:%S").astype(object).where(times.notna(), None)
+
+        self.pending.append(self._scale(df[FEATURES].to_numpy()))
+        for col in META:
+            self.meta[col] = np.concatenate([self.meta[col], df[col].to_numpy(dtype=object)])
+        if sum(len(p) for p in self.pending) >= REBUILD_SIZE or self.tree is None:
+            self.rebuild()
+        return int(fresh.sum())
+
+    def rebuild(self):
+        """버퍼를 합쳐 KD-트리를 다시 만듭니다."""
+        if self.pending:
+            self.points = np.vstack([self.points] + self.pending)
+            self.pending = []
+        self.tree = cKDTree(self.points) if len(self.points) else None
+
+    # ------------------------------------------
+    # 2. 검색
+    # ------------------------------------------
+    def query(self, features, k=5):
+        """
+        features(dict 또는 FEATURES 순서 리스트)와 가장 가까운 과거 스냅샷 k개.
+        반환: [{bearing, filename, time, label, rul, distance}, ...] (가까운 순)
+        """
+        if isinstance(features, dict):
+            features = [features[f] for f in FEATURES]
+        x = self._scale(features)
+
+        dist, idx = np.empty(0), np.empty(0, dtype=int)
+        if self.tree is not None:
+            kk = min(k, len(self.points))
+            dist, idx = self.tree.query(x, k=kk)
+            dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+        if self.pending:
+            # 버퍼는 작으므로 전수 비교 후 트리 결과와 합쳐 다시 상위 k개
+            buf = np.vstack(self.pending)
+            dist = np.concatenate([dist, np.linalg.norm(buf - x, axis=1)])
+            idx = np.concatenate([idx, len(self.points) + np.arange(len(buf))])
+            top = np.argsort(dist, kind="stable")[:k]
+            dist, idx = dist[top], idx[top]
+
+        m = {col: self.meta[col][idx] for col in META}
+        return [
+            {
+                "bearing": str(m['bearing'][i]),
+                "filename": str(m['filename'][i]),
+                "time": m['time'][i],
+                "label": None if pd.isna(m['Label'][i]) else int(m['Label'][i]),
+                "rul": None if pd.isna(m['RUL'][i]) else float(m['RUL'][i]),
+                "distance": float(dist[i]),
+            }
+            for i in range(len(idx))
+        ]
+
+    # ------------------------------------------
+    # 3. 저장 / 불러오기
+    # ------------------------------------------
+    def save(self, path=DEFAULT_PATH):
+        self.rebuild()
+        joblib.dump(self, path)
+
+
+def load_index(path=DEFAULT_PATH, scaler_path='scaler.pkl', data_path='bearing_dataset_final.csv'):
+    """저장된 인덱스를 불러오고, 없으면 최종 데이터셋으로 새로 만듭니다."""
+    if os.path.exists(path):
+        return joblib.load(path)
+    index = CaseIndex(joblib.load(scaler_path))
+    if os.path.exists(data_path):
+        index.add(pd.read_csv(data_path))
+        index.rebuild()
+    return index
+
+
+if __name__ == "__main__":
+    index = load_index()
+    added = index.add(pd.read_csv('bearing_dataset_final.csv'))
+    index.save()
+    print(f"✅ 유사 사례 인덱스 저장: {len(index)}개 스냅샷 (+{added}) → {DEFAULT_PATH}")
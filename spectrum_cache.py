@@ -0,0 +1,182 @@
+# spectrum_cache.py
+# 전체 수명 이력의 스펙트럼 워터폴(시간 x 주파수) 캐시
+# - 02_fft_analysis.py는 스냅샷 하나(2004.02.12.10.32.39)의 FFT만 보여줍니다.
+# - 여기서는 모든 스냅샷·베어링의 진폭 스펙트럼을 배치(행렬) 단위로 한 번에 FFT 하고,
+#   주파수 축을 n_bins개로 줄여(max pooling → 결함 주파수 피크 보존) 베어링별 파일에 행 단위로 이어 씁니다.
+# - 파일은 memmap으로 열리므로 뷰어는 필요한 시간/주파수 구간만 잘라 읽고, 다시 계산하지 않습니다.
+# - 새 스냅샷이 생기면 update()가 마지막 저장 시각 이후의 스냅샷만 계산해 뒤에 붙입니다.
+#
+# 저장 구조: <root>/meta.json, <root>/<bearing>.spec (float32, 행=스냅샷), <root>/<bearing>.time (float64)
+# 실행 예시: python spectrum_cache.py 2nd_test.braw     (raw_archive 아카이브)
+#           python spectrum_cache.py ./data/2nd_test   (NASA 텍스트 폴더)
+import json
+import os
+import sys
+
+import numpy as np
+from scipy.fft import rfft
+
+from raw_archive import ArchiveReader, read_snapshot_file
+from trend_pyramid import snapshot_time
+
+FS = 20000            # 샘플링 주파수 (NASA 데이터셋 20kHz)
+DEFAULT_ROOT = "waterfall"
+
+
+class Waterfall:
+    def __init__(self, root=DEFAULT_ROOT, fs=FS, n_bins=1024):
+        self.root = root
+        meta_path = os.path.join(root, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {"fs": fs, "n_bins": n_bins, "n_samples": None}
+
+    # ------------------------------------------
+    # 내부: 파일 입출력
+    # ------------------------------------------
+    def _path(self, bearing, kind):
+        return os.path.join(self.root, f"{bearing}.{kind}")
+
+    def _times(self, bearing):
+        path = self._path(bearing, "time")
+        n = os.path.getsize(path) // 8 if os.path.exists(path) else 0
+        return np.memmap(path, dtype="<f8", mode="r", shape=(n,)) if n else np.empty(0)
+
+    def _spectra(self, bearing):
+        n = len(self._times(bearing))
+        if n == 0:
+            return np.empty((0, self.meta["n_bins"]), dtype=np.float32)
+        return np.memmap(self._path(bearing, "spec"), dtype="<f4", mode="r", shape=(n, self.meta["n_bins"]))
+
+    def _save_meta(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+
+    @property
+    def freqs(self):
+        """각 주파수 칸의 시작 주파수(Hz). 칸 하나 = bin_width Hz 구간의 최대 진폭"""
+        return np.arange(self.meta["n_bins"]) * self.bin_width
+
+    @property
+    def bin_width(self):
+        # FFT 칸 간격(fs/N) x 한 칸에 묶인 FFT 칸 수
+        n = self.meta["n_samples"] or 20480
+        pool = (n // 2) // self.meta["n_bins"]
+        return pool * self.meta["fs"] / n
+
+    def bearings(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(f[:-5] for f in os.listdir(self.root) if f.endswith(".time"))
+
+    # ------------------------------------------
+    # 1. 배치 스펙트럼 계산
+    # ------------------------------------------
+    def compute(self, signals):
+        """
+        (배치, 샘플 수) 파형 행렬 → (배치, n_bins) 진폭 스펙트럼 (float32)
+        02_fft_analysis.py와 같은 정규화(2/N * |FFT|)를 쓰고, 주파수 칸을 max pooling으로 줄입니다.
+        """
+        signals = np.asarray(signals, dtype=np.float32)
+        n = signals.shape[1]
+        amplitude = (2.0 / n) * np.abs(rfft(signals, axis=1, workers=-1))[:, : n // 2]
+        pool = amplitude.shape[1] // self.meta["n_bins"]
+        usable = pool * self.meta["n_bins"]
+        return amplitude[:, :usable].reshape(len(signals), self.meta["n_bins"], pool).max(axis=2).astype(np.float32)
+
+    def append(self, bearing, times, spectra):
+        os.makedirs(self.root, exist_ok=True)
+        n_done = len(self._times(bearing))
+        with open(self._path(bearing, "spec"), "ab") as f:
+            # 이전 실행이 스펙트럼만 쓰고 끊겼다면 짝이 없는 행을 잘라내고 이어 씁니다.
+            f.truncate(n_done * self.meta["n_bins"] * 4)
+            f.write(np.ascontiguousarray(spectra, dtype="<f4").tobytes())
+        # 시각 파일은 스펙트럼 다음에 기록 → 중간에 끊겨도 시각 개수 기준으로 완성된 행만 보입니다.
+        with open(self._path(bearing, "time"), "ab") as f:
+            f.write(np.asarray(times, dtype="<f8").tobytes())
+
+    def last_time(self, bearing):
+        times = self._times(bearing)
+        return float(times[-1]) if len(times) else -np.inf
+
+    def update(self, source, bearings=("B1", "B2", "B3", "B4"), batch_size=64):
+        """
+        source(ArchiveReader 또는 NASA 텍스트 폴더 경로)에서 아직 캐시에 없는 스냅샷만 계산해 추가합니다.
+        채널 c ↔ 베어링 bearings[c] (NASA 2nd_test 기준 col 0=B1 ... 3=B4)
+        """
+        if isinstance(source, str) and os.path.isdir(source):
+            names = sorted(f for f in os.listdir(source)
+                           if not f.startswith('.') and not os.path.isdir(os.path.join(source, f)))
+            times = snapshot_time(names) if names else np.empty(0)
+            return self._add_missing(times, lambda i: read_snapshot_file(os.path.join(source, names[i])),
+                                     bearings, batch_size)
+        if isinstance(source, ArchiveReader):
+            return self._add_missing(source.times, source.read, bearings, batch_size)
+        # 경로로 받은 아카이브는 여기서 열었으므로 여기서 닫습니다.
+        with ArchiveReader(source) as reader:
+            return self._add_missing(reader.times, reader.read, bearings, batch_size)
+
+    def _add_missing(self, times, load, bearings, batch_size):
+        """times[i] 시각의 스냅샷을 load(i)로 읽어, 캐시의 마지막 시각 이후 것만 배치 FFT로 추가합니다."""
+        last = min(self.last_time(b) for b in bearings)
+        todo = [i for i in np.argsort(times, kind="stable") if times[i] > last]
+        added = 0
+        for start in range(0, len(todo), batch_size):
+            batch = todo[start:start + batch_size]
+            snapshots = np.stack([load(i) for i in batch])      # (배치, 샘플 수, 채널 수)
+            if self.meta["n_samples"] is None:
+                self.meta["n_samples"] = int(snapshots.shape[1])
+                self._save_meta()
+            batch_times = times[batch]
+            for ch, bearing in enumerate(bearings[: snapshots.shape[2]]):
+                keep = batch_times > self.last_time(bearing)
+                if keep.any():
+                    self.append(bearing, batch_times[keep], self.compute(snapshots[keep, :, ch]))
+            added += len(batch)
+            print(f"✅ 스펙트럼 {added}/{len(todo)}개 스냅샷 처리...")
+        return added
+
+    # ------------------------------------------
+    # 2. 뷰어 API (재계산 없이 잘라 읽기)
+    # ------------------------------------------
+    def slice(self, bearing, t_start=None, t_end=None, f_start=0.0, f_end=None, step=1):
+        """
+        시간 [t_start, t_end] (epoch 초) x 주파수 [f_start, f_end] (Hz) 구간을 반환합니다.
+        step > 1이면 시간 축을 step 간격으로 건너뛰어 읽습니다. (긴 구간 미리보기용)
+        반환: (times, freqs, 2차원 배열[시간, 주파수])
+        """
+        times = self._times(bearing)
+        lo = 0 if t_start is None else int(np.searchsorted(times, t_start, side="left"))
+        hi = len(times) if t_end is None else int(np.searchsorted(times, t_end, side="right"))
+        f_lo = int(f_start // self.bin_width)
+        f_hi = self.meta["n_bins"] if f_end is None else min(self.meta["n_bins"], int(np.ceil(f_end / self.bin_width)))
+        spectra = self._spectra(bearing)
+        return (np.array(times[lo:hi:step]), self.freqs[f_lo:f_hi],
+                np.array(spectra[lo:hi:step, f_lo:f_hi]))
+
+
+def plot_waterfall(waterfall, bearing="B1", **window):
+    """워터폴(시간 x 주파수) 이미지를 로그 스케일로 그립니다."""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    times, freqs, spectra = waterfall.slice(bearing, **window)
+    t = pd.to_datetime(times, unit="s")
+    plt.figure(figsize=(12, 6))
+    plt.pcolormesh(freqs, t, np.log10(spectra + 1e-6), shading="auto", cmap="viridis")
+    plt.colorbar(label="log10 Amplitude")
+    plt.title(f"Spectrum Waterfall ({bearing})")
+    plt.xlabel("Frequency (Hz)")
+    plt.ylabel("Time")
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "./data/2nd_test/"
+    waterfall = Waterfall()
+    waterfall.update(source)
+    plot_waterfall(waterfall, "B1")
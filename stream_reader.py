@@ -0,0 +1,183 @@
+# stream_reader.py
+# 연속 DAQ 기록 파일용 스트리밍 리더
+# - 기존 로더들은 1초짜리 스냅샷 파일을 통째로 DataFrame에 올리지만, 새 DAQ 장비는 몇 시간짜리 연속 기록을
+#   한 파일로 씁니다. 이런 파일은 pandas 객체로 한 번에 올릴 수 없습니다.
+# - iter_blocks()는 파일을 고정 크기 블록(기본 20480샘플 = NASA 스냅샷 1개 분량)씩 읽어 넘겨주는 제너레이터입니다.
+#   한 번에 메모리에 있는 것은 블록 하나뿐이므로 파일 크기와 관계없이 메모리 사용량이 일정합니다.
+# - stream_features()는 각 블록을 03_create_dataset.py와 같은 특징 계산(signal_features.py)에 넣어
+#   특징 행을 바로바로 내보냅니다.
+#
+# 실행 예시:
+#   python stream_reader.py recording.txt --out stream_features.csv                    (탭 구분 텍스트)
+#   python stream_reader.py recording.bin --format binary --dtype <f4 --channels 4     (인터리브 바이너리)
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from signal_features import FEATURES, snapshot_features, window_features
+
+FS = 20000
+BLOCK_SIZE = 20480
+
+
+# ==========================================
+# 1. 블록 단위 읽기
+# ==========================================
+class _CountingFile:
+    """읽은 바이트 수를 세는 파일 래퍼 (처리량 MB/s 계산용)"""
+
+    def __init__(self, f):
+        self._f = f
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        n = self._f.readinto(buffer)
+        self.bytes_read += n or 0
+        return n
+
+    def __iter__(self):
+        for line in self._f:
+            self.bytes_read += len(line)
+            yield line
+
+    def readline(self, size=-1):
+        line = self._f.readline(size)
+        self.bytes_read += len(line)
+        return line
+
+
+def iter_blocks(path, block_size=BLOCK_SIZE, fmt="text", n_channels=4, dtype="<f4", sep="\t", stats=None):
+    """
+    큰 원시 파일을 (시작 샘플 위치, 블록 배열[샘플, 채널]) 순서로 내보냅니다.
+    - fmt="text"  : 탭 구분 텍스트 (NASA 스냅샷과 같은 형식). pandas C 파서로 block_size행씩 읽습니다.
+    - fmt="binary": 채널이 인터리브된 raw 바이너리 (dtype 예: '<f4', '<i2'). 미리 잡아둔 버퍼 하나에 반복해서 읽습니다.
+    마지막 블록은 block_size보다 짧을 수 있습니다.
+    stats(dict)를 넘기면 stats['bytes']에 지금까지 읽은 바이트 수를 갱신합니다.
+    """
+    stats = stats if stats is not None else {}
+    start = 0
+    if fmt == "text":
+        with open(path, "rb") as raw:
+            f = _CountingFile(raw)
+            for chunk in pd.read_csv(f, sep=sep, header=None, chunksize=block_size, dtype=np.float64):
+                block = chunk.to_numpy()
+                stats["bytes"] = f.bytes_read
+                yield start, block
+                start += len(block)
+    elif fmt == "binary":
+        dtype = np.dtype(dtype)
+        buffer = bytearray(block_size * n_channels * dtype.itemsize)
+        view = memoryview(buffer)
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                # readinto는 요청보다 적게 읽을 수 있으므로 블록이 찰 때까지 반복
+                filled = 0
+                while filled < len(buffer):
+                    n = f.readinto(view[filled:])
+                    if not n:
+                        break
+                    filled += n
+                n_samples = filled // (n_channels * dtype.itemsize)
+                if n_samples == 0:
+                    break
+                stats["bytes"] = stats.get("bytes", 0) + filled
+                block = np.frombuffer(buffer, dtype=dtype, count=n_samples * n_channels).reshape(n_samples, n_channels)
+                # 버퍼는 다음 블록에서 재사용되므로, 소비자가 블록을 보관할 경우를 대비해 float64로 변환한 복사본을 넘깁니다.
+                yield start, block.astype(np.float64)
+                start += n_samples
+                if filled < len(buffer):
+                    break
+    else:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+
+# ==========================================
+# 2. 블록 → 특징 행
+# ==========================================
+def stream_features(path, block_size=BLOCK_SIZE, fmt="text", n_channels=4, dtype="<f4",
+                    start_time=None, fs=FS, window=None, hop=None, min_samples=None, stats=None):
+    """
+    파일을 블록 단위로 읽으며 블록·채널마다 특징 행(dict)을 하나씩 내보냅니다.
+    - start_time(epoch 초)을 주면 각 블록의 측정 시각(time)도 함께 기록합니다.
+    - window를 주면 블록 전체 특징 대신 블록 안 창(window/hop)별 특징 행을 내보냅니다. (window 컬럼 포함)
+    - 마지막 블록이 min_samples(기본: block_size의 절반)보다 짧으면 통계가 불안정하므로 건너뜁니다.
+    """
+    min_samples = block_size // 2 if min_samples is None else min_samples
+    for block_idx, (start, block) in enumerate(iter_blocks(path, block_size, fmt, n_channels, dtype, stats=stats)):
+        if len(block) < min_samples:
+            break
+        base = {"block": block_idx, "start_sample": start}
+        if start_time is not None:
+            base["time"] = start_time + start / fs
+        for ch in range(block.shape[1]):
+            signal = block[:, ch]
+            bearing = f"B{ch + 1}"
+            if window:
+                win = window_features(signal, window, hop or window // 2)
+                for w in range(len(win["start"])):
+                    row = dict(base, bearing=bearing, window=w, start=int(win["start"][w]))
+                    row.update({f: float(win[f][w]) for f in FEATURES})
+                    yield row
+            else:
+                row = dict(base, bearing=bearing)
+                row.update({f: float(v) for f, v in snapshot_features(signal).items()})
+                yield row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="연속 DAQ 기록 → 특징 행 스트리밍 추출")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["text", "binary"], default="text")
+    parser.add_argument("--block", type=int, default=BLOCK_SIZE, help="블록 크기 (샘플 수)")
+    parser.add_argument("--channels", type=int, default=4, help="채널 수 (binary 전용)")
+    parser.add_argument("--dtype", default="<f4", help="샘플 자료형 (binary 전용)")
+    parser.add_argument("--start-time", default=None, help="기록 시작 시각 (예: 2004-02-12T10:32:39)")
+    parser.add_argument("--fs", type=float, default=FS)
+    parser.add_argument("--window", type=int, default=None, help="블록 내부 창 크기 (생략 시 블록 전체 특징)")
+    parser.add_argument("--hop", type=int, default=None)
+    parser.add_argument("--out", default="stream_features.csv")
+    args = parser.parse_args()
+
+    start_time = pd.Timestamp(args.start_time).timestamp() if args.start_time else None
+    stats = {"bytes": 0}
+    total = os.path.getsize(args.path)
+    n_rows = 0
+    t0 = time.perf_counter()
+    last_report = t0
+
+    print(f"🚀 스트리밍 시작: {args.path} ({total / 1e6:.1f} MB)")
+    with open(args.out, "w", newline="") as out:
+        writer = None
+        for row in stream_features(args.path, args.block, args.format, args.channels, args.dtype,
+                                   start_time, args.fs, args.window, args.hop, stats=stats):
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            n_rows += 1
+
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                out.flush()
+                print(f"  ... {stats['bytes'] / 1e6:.1f}/{total / 1e6:.1f} MB, "
+                      f"{stats['bytes'] / 1e6 / (now - t0):.1f} MB/s, {n_rows}행")
+                last_report = now
+
+    elapsed = time.perf_counter() - t0
+    print("-" * 30)
+    print(f"🎉 완료: {n_rows}행 → {args.out}")
+    print(f"처리량: {stats['bytes'] / 1e6 / elapsed:.1f} MB/s ({elapsed:.1f}s)")
+    print("-" * 30)
+
+
+if __name__ == "__main__":
+    main()
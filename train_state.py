@@ -0,0 +1,48 @@
+# train_state.py
+# 학습 워터마크(어디까지 학습했는지) 기록
+# - 06/07 학습 스크립트와 08_incremental_update.py가 모델별로 "베어링마다 마지막으로 학습에 쓴 스냅샷 파일명"을 남깁니다.
+# - 증분 학습은 이 워터마크 이후의 행(= 새로 수집된 데이터)만 골라 학습합니다.
+# - NASA 파일명(2004.02.12.10.32.39)은 문자열 순서 = 시간 순서이므로 그대로 비교합니다.
+import json
+import os
+import time
+
+import numpy as np
+
+STATE_PATH = "train_state.json"
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _bearings(df, bearing_col, default_bearing):
+    return df[bearing_col].astype(str) if bearing_col in df.columns else np.full(len(df), default_bearing)
+
+
+def save_state(df, model_name, path=STATE_PATH, bearing_col="bearing", order_col="filename", default_bearing="B1"):
+    """df(이번에 학습에 쓴 행들)의 베어링별 마지막 파일명을 model_name 항목에 기록합니다."""
+    state = load_state(path)
+    marks = dict(state.get(model_name, {}).get("watermark", {}))
+    if len(df):
+        last = df.groupby(_bearings(df, bearing_col, default_bearing))[order_col].max()
+        for bearing, name in last.items():
+            marks[bearing] = max(name, marks.get(bearing, ""))
+    state[model_name] = {
+        "watermark": marks,
+        "rows": state.get(model_name, {}).get("rows", 0) + len(df),
+        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+
+
+def new_rows(df, model_name, path=STATE_PATH, bearing_col="bearing", order_col="filename", default_bearing="B1"):
+    """model_name이 아직 학습하지 않은 행이면 True인 bool 배열 (워터마크가 없는 베어링은 전부 새 행)"""
+    marks = load_state(path).get(model_name, {}).get("watermark", {})
+    bearings = _bearings(df, bearing_col, default_bearing)
+    mark = np.array([marks.get(b, "") for b in bearings], dtype=object)
+    return (df[order_col].to_numpy(dtype=object) > mark).astype(bool)
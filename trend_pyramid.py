@@ -0,0 +1,190 @@
+# trend_pyramid.py
+# 다중 해상도 트렌드 피라미드 (min / max / mean)
+# - 특징량(RMS, Kurtosis 등)을 베어링·특징별로 여러 시간 해상도에 미리 요약해 둡니다.
+#   레벨 0 = 스냅샷 1개당 1점, 레벨 k = 레벨 0의 FACTOR**k 개를 묶은 1점
+# - 각 점은 min / max / sum / count를 함께 저장하므로 아무리 줌아웃해도 순간 피크(max)가 사라지지 않습니다.
+# - 새 스냅샷이 들어오면 append()로 뒤에 붙이고, 채워진 상위 버킷만 새로 계산합니다. (증분 갱신)
+# - read()는 요청 구간에서 점 개수가 max_points 이하가 되는 가장 촘촘한 레벨을 골라 그 구간만 읽습니다.
+#   → 전체 이력이 몇 년치든 읽는 양은 max_points 수준으로 일정합니다.
+#
+# 저장 구조: <root>/<bearing>/<feature>.L<k>.bin  (고정 길이 레코드를 이어붙인 바이너리, memmap으로 읽음)
+# ※ 쓰기는 한 프로세스(특징 추출 단계)만 한다고 가정합니다. 읽기는 여러 프로세스가 동시에 해도 됩니다.
+import os
+
+import numpy as np
+import pandas as pd
+
+FACTOR = 8        # 한 단계 올라갈 때 묶는 개수
+MAX_LEVELS = 8    # 8**7 ≈ 2백만 스냅샷까지 한 점으로 요약 가능
+DEFAULT_ROOT = "trend_pyramid"
+
+RECORD = np.dtype([
+    ("t0", "<f8"),      # 버킷 시작 시각 (epoch 초)
+    ("t1", "<f8"),      # 버킷 끝 시각
+    ("min", "<f8"),
+    ("max", "<f8"),
+    ("sum", "<f8"),
+    ("count", "<i8"),
+])
+
+
+def snapshot_time(filenames):
+    """NASA 파일명(예: 2004.02.12.10.32.39)을 epoch 초(float)로 변환합니다."""
+    ts = pd.to_datetime(pd.Series(filenames), format="%Y.%m.%d.%H.%M.%S")
+    return (ts - pd.Timestamp("1970-01-01")).dt.total_seconds().to_numpy()
+
+
+class TrendPyramid:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    # ------------------------------------------
+    # 내부: 레벨 파일 입출력
+    # ------------------------------------------
+    def _path(self, bearing, feature, level):
+        return os.path.join(self.root, str(bearing), f"{feature}.L{level}.bin")
+
+    def _count(self, bearing, feature, level):
+        path = self._path(bearing, feature, level)
+        return os.path.getsize(path) // RECORD.itemsize if os.path.exists(path) else 0
+
+    def _records(self, bearing, feature, level):
+        """레벨 전체를 memmap으로 엽니다. (실제로 읽는 건 슬라이스한 부분뿐)"""
+        n = self._count(bearing, feature, level)
+        if n == 0:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(self._path(bearing, feature, level), dtype=RECORD, mode="r", shape=(n,))
+
+    def _write(self, bearing, feature, level, records):
+        os.makedirs(os.path.join(self.root, str(bearing)), exist_ok=True)
+        with open(self._path(bearing, feature, level), "ab") as f:
+            f.write(np.ascontiguousarray(records, dtype=RECORD).tobytes())
+
+    # ------------------------------------------
+    # 1. 증분 추가
+    # ------------------------------------------
+    def last_time(self, bearing, feature):
+        recs = self._records(bearing, feature, 0)
+        return float(recs["t0"][-1]) if len(recs) else -np.inf
+
+    def append(self, bearing, times, values):
+        """
+        새 스냅샷들을 추가합니다.
+        - times: epoch 초 배열 (오름차순)
+        - values: {특징 이름: 값 배열}
+        이미 저장된 마지막 시각 이하의 데이터는 건너뛰므로 같은 데이터를 여러 번 넣어도 안전합니다.
+        반환: 특징별로 새로 추가된 점 개수
+        """
+        times = np.asarray(times, dtype=np.float64)
+        added = {}
+        for feature, vals in values.items():
+            vals = np.asarray(vals, dtype=np.float64)
+            new = times > self.last_time(bearing, feature)
+            if not new.any():
+                added[feature] = 0
+                continue
+
+            base = np.empty(int(new.sum()), dtype=RECORD)
+            base["t0"] = base["t1"] = times[new]
+            base["min"] = base["max"] = base["sum"] = vals[new]
+            base["count"] = 1
+            self._write(bearing, feature, 0, base)
+            self._rollup(bearing, feature)
+            added[feature] = len(base)
+        return added
+
+    def _rollup(self, bearing, feature):
+        # 아래 레벨에서 FACTOR개가 꽉 찬 버킷 중 아직 요약되지 않은 것만 상위 레벨에 추가
+        for level in range(1, MAX_LEVELS):
+            lower = self._records(bearing, feature, level - 1)
+            done = self._count(bearing, feature, level)
+            complete = len(lower) // FACTOR
+            if complete <= done:
+                break
+            block = np.asarray(lower[done * FACTOR: complete * FACTOR]).reshape(-1, FACTOR)
+            upper = np.empty(len(block), dtype=RECORD)
+            upper["t0"] = block["t0"][:, 0]
+            upper["t1"] = block["t1"][:, -1]
+            upper["min"] = block["min"].min(axis=1)
+            upper["max"] = block["max"].max(axis=1)
+            upper["sum"] = block["sum"].sum(axis=1)
+            upper["count"] = block["count"].sum(axis=1)
+            self._write(bearing, feature, level, upper)
+
+    # ------------------------------------------
+    # 2. 구간 조회 (줌 레벨 자동 선택)
+    # ------------------------------------------
+    def read(self, bearing, feature, t_start=None, t_end=None, max_points=1000):
+        """
+        [t_start, t_end] 구간을 max_points 이하(+ 마지막 미완성 버킷 몇 개)로 요약해 반환합니다.
+        반환: dict(t0, t1, min, max, mean, count 배열, level=선택된 레벨)
+        """
+        t_start = -np.inf if t_start is None else t_start
+        t_end = np.inf if t_end is None else t_end
+
+        # (1) 구간 안 점 개수가 max_points 이하인 가장 촘촘한 레벨 선택
+        level = 0
+        for level in range(MAX_LEVELS):
+            recs = self._records(bearing, feature, level)
+            lo, hi = self._window(recs, t_start, t_end)
+            if hi - lo <= max_points or self._count(bearing, feature, level + 1) == 0:
+                break
+
+        parts = [np.asarray(recs[lo:hi])]
+
+        # (2) 선택 레벨의 마지막 버킷 이후(아직 FACTOR개가 안 차서 요약되지 않은 꼬리)는 아래 레벨에서 채움
+        covered = len(recs)
+        for lower in range(level - 1, -1, -1):
+            covered *= FACTOR
+            recs = self._records(bearing, feature, lower)
+            lo, hi = self._window(recs, t_start, t_end)
+            lo = max(lo, covered)
+            if hi > lo:
+                parts.append(np.asarray(recs[lo:hi]))
+            covered = len(recs)
+
+        out = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+        return {
+            "t0": out["t0"], "t1": out["t1"],
+            "min": out["min"], "max": out["max"],
+            "mean": out["sum"] / np.maximum(out["count"], 1),
+            "count": out["count"], "level": level,
+        }
+
+    @staticmethod
+    def _window(recs, t_start, t_end):
+        # 버킷이 구간과 겹치면 포함 (t1 >= t_start, t0 <= t_end). t0/t1 모두 오름차순이므로 이진 탐색.
+        if len(recs) == 0:
+            return 0, 0
+        lo = int(np.searchsorted(recs["t1"], t_start, side="left"))
+        hi = int(np.searchsorted(recs["t0"], t_end, side="right"))
+        return lo, max(lo, hi)
+
+    def time_at(self, bearing, feature, index):
+        """레벨 0의 index번째 스냅샷 시각 (파일 순서 → 시각 변환용, 범위를 넘으면 마지막 스냅샷 시각)"""
+        recs = self._records(bearing, feature, 0)
+        return float(recs["t0"][min(index, len(recs) - 1)])
+
+
+# ==========================================
+# 3. 특징량 테이블 → 피라미드 갱신
+# ==========================================
+def update_from_features(df, root=DEFAULT_ROOT, features=("RMS", "Std_Dev", "Max_Amp", "Kurtosis", "Skewness"),
+                         default_bearing="B1"):
+    """
+    03_create_dataset.py가 만든 특징량 테이블(filename + 특징 컬럼)을 피라미드에 반영합니다.
+    'bearing' 컬럼이 있으면 베어링별로, 없으면 default_bearing 하나로 저장합니다.
+    """
+    pyramid = TrendPyramid(root)
+    groups = df.groupby("bearing") if "bearing" in df.columns else [(default_bearing, df)]
+    for bearing, group in groups:
+        group = group.sort_values("filename")
+        times = snapshot_time(group["filename"])
+        values = {f: group[f].to_numpy() for f in features if f in group.columns}
+        added = pyramid.append(bearing, times, values)
+        print(f"📈 트렌드 피라미드 갱신: {bearing} (+{max(added.values(), default=0)}개 스냅샷)")
+    return pyramid
+
+
+if __name__ == "__main__":
+    update_from_features(pd.read_csv("bearing_dataset_features.csv"))